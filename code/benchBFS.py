@@ -0,0 +1,18 @@
+# Deque BFS against the level-synchronous bfsFrontier engine
+# on a random (low-diameter) graph.
+# Usage: python3 benchBFS.py [n] [m]
+from undirectedGraph import Graph
+from benchUtil import randomEdges, timed, argSizes
+
+
+if __name__ == "__main__":
+    n, m = (argSizes([200000, 2000000]) + [2000000])[:2]
+    g = Graph(n, randomEdges(n, m), storage="csr")
+
+    (dist, _, _), dequeTime = timed(g.bfs, 0)
+    print(f"bfs (deque)                     {dequeTime:6.2f}s")
+    for name, directionOptimizing in (("top-down", False),
+                                      ("direction-optimizing", True)):
+        (levels, _), t = timed(g.bfsFrontier, 0, directionOptimizing)
+        assert levels.tolist() == dist
+        print(f"bfsFrontier {name:<20}{t:6.2f}s  x{dequeTime / t:.1f}")
@@ -0,0 +1,49 @@
+# Latency of Trie.complete (cached top list) against enumerating and
+# sorting every completion, for prefixes typed by Zipf-popular users.
+# Usage: python3 benchComplete.py [words] [queries]
+import random
+import time
+
+from trie import Trie
+from benchUtil import randomWords, argSizes
+
+
+def sortAll(trie, prefix, k):
+    # baseline: every word under the prefix, then sort
+    return sorted(((-c, w) for c, w in trie.iterComplete(prefix)))[:k]
+
+
+def latencies(f, queries):
+    times = []
+    for q in queries:
+        start = time.perf_counter()
+        f(q)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2], times[int(len(times) * 0.99)]
+
+
+if __name__ == "__main__":
+    count, q = (argSizes([200000, 20000]) + [20000])[:2]
+    words = randomWords(count)
+    trie = Trie()
+    for rank, w in enumerate(words, 1):
+        for _ in range(max(1, 1000 // rank)):
+            trie.insert(w)
+
+    # users type the first 1 to 4 letters of popular words
+    rng = random.Random(251)
+    popular = rng.choices(words, [1 / r for r in range(1, count + 1)], k=q)
+    queries = [w[:rng.randint(1, 4)] for w in popular]
+
+    # the baseline walks whole subtrees, so it gets a sample
+    p50, p99 = latencies(lambda p: sortAll(trie, p, 10), queries[:500])
+    print(f"sort all completions   p50 {p50 * 1000:8.3f} ms  "
+          f"p99 {p99 * 1000:8.3f} ms")
+    # every distinct prefix once, building its top list
+    p50, p99 = latencies(trie.complete, list(dict.fromkeys(queries)))
+    print(f"complete, cold cache   p50 {p50 * 1000:8.3f} ms  "
+          f"p99 {p99 * 1000:8.3f} ms")
+    p50, p99 = latencies(trie.complete, queries)
+    print(f"complete, warm cache   p50 {p50 * 1000:8.3f} ms  "
+          f"p99 {p99 * 1000:8.3f} ms")
@@ -0,0 +1,28 @@
+# Throughput of dijkstraMany as the pool grows, against a plain loop.
+# Usage: python3 benchDijkstraMany.py [n] [m] [sources]
+import os
+
+from weightedUndirectedGraph import Graph
+from parallelDijkstra import dijkstraMany
+from benchUtil import randomEdges, timed, argSizes
+
+
+def drain(results):
+    for _ in results:
+        pass
+
+
+if __name__ == "__main__":
+    cpus = os.cpu_count()
+    n, m, k = (argSizes([100000, 1000000]) + [1000000, 4 * cpus])[:3]
+    g = Graph(n, randomEdges(n, m, weighted=True), storage="csr")
+    sources = list(range(k))
+
+    _, loopTime = timed(lambda: [g.dijkstra(s) for s in sources])
+    print(f"loop         {k / loopTime:8.2f} sources/s")
+
+    poolSizes = sorted({2 ** i for i in range(cpus.bit_length())} | {cpus})
+    for workers in poolSizes:
+        _, poolTime = timed(drain, dijkstraMany(g, sources, workers))
+        print(f"{workers:3} workers  {k / poolTime:8.2f} sources/s"
+              f"  x{loopTime / poolTime:.2f}")
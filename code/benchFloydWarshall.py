@@ -0,0 +1,36 @@
+# Floyd-Warshall engines on random weighted graphs.
+# The pure Python loop is only timed up to PYTHON_LIMIT vertices;
+# beyond that its time is extrapolated from the n^3 growth.
+# Usage: python3 benchFloydWarshall.py [n ...]
+from weightedUndirectedGraph import Graph
+from benchUtil import randomEdges, timed, argSizes
+
+PYTHON_LIMIT = 200
+
+
+if __name__ == "__main__":
+    pythonRef = None  # (n, seconds)
+    for n in argSizes([200, 1000, 3000]):
+        g = Graph(n, randomEdges(n, 5 * n, weighted=True))
+
+        if n <= PYTHON_LIMIT:
+            _, pythonTime = timed(g.floydWarshall)
+            pythonRef = (n, pythonTime)
+            note = ""
+        else:
+            refN, refTime = pythonRef or (PYTHON_LIMIT, None)
+            if refTime is None:
+                g0 = Graph(refN, randomEdges(refN, 5 * refN, weighted=True))
+                _, refTime = timed(g0.floydWarshall)
+                pythonRef = (refN, refTime)
+            pythonTime = refTime * (n / refN) ** 3
+            note = " (extrapolated)"
+
+        _, numpyTime = timed(g.floydWarshall, engine="numpy")
+        _, blockedTime = timed(g.floydWarshall, engine="blocked",
+                               blockSize=64)
+        print(f"n = {n}")
+        print(f"  python  {pythonTime:9.2f}s{note}")
+        print(f"  numpy   {numpyTime:9.2f}s  x{pythonTime / numpyTime:.0f}")
+        print(f"  blocked {blockedTime:9.2f}s"
+              f"  x{pythonTime / blockedTime:.0f}")
@@ -0,0 +1,54 @@
+# Trie.fuzzySearch against computing the edit distance to every word,
+# for misspelled queries on a large dictionary.
+# Usage: python3 benchFuzzy.py [words] [queries]
+import random
+
+from trie import Trie
+from benchUtil import randomWords, timed, argSizes
+
+
+def editDistance(a, b):
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1,
+                                       prev + (ca != cb))
+    return row[-1]
+
+
+def bruteForce(words, word, maxDistance, k):
+    scored = ((editDistance(word, w), w) for w in words)
+    return sorted(x for x in scored if x[0] <= maxDistance)[:k]
+
+
+def misspell(word, rng):
+    i = rng.randrange(len(word))
+    c = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return rng.choice([word[:i] + c + word[i + 1:],  # substitution
+                       word[:i] + c + word[i:],  # insertion
+                       word[:i] + word[i + 1:]])  # deletion
+
+
+if __name__ == "__main__":
+    count, q = (argSizes([500000, 200]) + [200])[:2]
+    words = randomWords(count)
+    trie = Trie()
+    for w in words:
+        trie.insert(w)
+    rng = random.Random(251)
+    queries = [misspell(rng.choice(words), rng) for _ in range(q)]
+
+    for maxDistance in (1, 2):
+        results, secs = timed(lambda: [trie.fuzzySearch(x, maxDistance, 10)
+                                       for x in queries])
+        perQuery = secs / q
+        # brute force scans the whole dictionary, so only a few queries
+        sample = queries[:3]
+        expected, bruteSecs = timed(lambda: [
+            bruteForce(words, x, maxDistance, 10) for x in sample])
+        assert results[:len(sample)] == expected
+        perBrute = bruteSecs / len(sample)
+        print(f"maxDistance {maxDistance}: fuzzySearch "
+              f"{perQuery * 1000:7.2f} ms/query  brute force "
+              f"{perBrute * 1000:8.1f} ms/query  x{perBrute / perQuery:.0f}")
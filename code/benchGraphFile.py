@@ -0,0 +1,37 @@
+# Rebuilding a graph from its edge list against mapping the binary
+# file written by save, then running the algorithms on the mapping.
+# Usage: python3 benchGraphFile.py [n] [m]
+import os
+import tempfile
+
+import directedGraph
+import undirectedGraph
+import weightedUndirectedGraph
+from benchUtil import randomEdges, timed, argSizes
+
+
+def bench(name, cls, edges, n, run):
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "g.csr")
+        g, buildTime = timed(cls, n, edges, storage="csr")
+        g.save(path)
+        mapped, loadTime = timed(cls.load, path)
+        _, runTime = timed(run, mapped)
+        del g, mapped
+    print(f"{name:<28} build {buildTime:6.2f}s  load {loadTime * 1000:6.2f}ms"
+          f"  x{buildTime / loadTime:.0f}  run on the mapping {runTime:6.2f}s")
+
+
+if __name__ == "__main__":
+    n, m = (argSizes([200000, 1000000]) + [1000000])[:2]
+    edges = randomEdges(n, m)
+    weightedEdges = randomEdges(n, m, weighted=True)
+
+    bench("undirected bfs", undirectedGraph.Graph, edges, n,
+          lambda g: g.bfs(0))
+    bench("directed kojaraju", directedGraph.Graph, edges, n,
+          lambda g: g.kojaraju())
+    bench("weighted dijkstra", weightedUndirectedGraph.Graph, weightedEdges,
+          n, lambda g: g.dijkstra(0))
+    bench("weighted kruskalMST", weightedUndirectedGraph.Graph, weightedEdges,
+          n, lambda g: g.kruskalMST())
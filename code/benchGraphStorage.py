@@ -0,0 +1,38 @@
+# Memory and traversal throughput of the list-of-lists adjacency
+# against the CSR adjacency (storage="csr").
+# Usage: python3 benchGraphStorage.py [n] [m]
+import directedGraph
+import undirectedGraph
+import weightedUndirectedGraph
+from benchUtil import randomEdges, timed, deepSizeof, argSizes
+
+
+def adjacencyBytes(g):
+    if g.storage == "csr":
+        return g.adjList.nbytes()
+    return deepSizeof(g.adjList)
+
+
+def bench(name, cls, edges, n, run):
+    print(name)
+    for storage in ("list", "csr"):
+        g, buildTime = timed(cls, n, edges, storage=storage)
+        _, runTime = timed(run, g)
+        print(f"  {storage:>4}: adjacency {adjacencyBytes(g) / 2**20:8.2f} MiB"
+              f"  build {buildTime:6.2f}s"
+              f"  traversal {len(edges) / runTime / 1e6:6.2f} M edges/s")
+
+
+if __name__ == "__main__":
+    n, m = (argSizes([2000, 200000]) + [200000])[:2]
+    edges = randomEdges(n, m)
+    weightedEdges = randomEdges(n, m, weighted=True)
+
+    bench("undirected bfs", undirectedGraph.Graph, edges, n,
+          lambda g: g.bfs(0))
+    bench("undirected dfs_iterative", undirectedGraph.Graph, edges, n,
+          lambda g: g.dfs_iterative(0))
+    bench("directed kahnTopologicalSort", directedGraph.Graph, edges, n,
+          lambda g: g.kahnTopologicalSort())
+    bench("weighted dijkstra", weightedUndirectedGraph.Graph, weightedEdges, n,
+          lambda g: g.dijkstra(0))
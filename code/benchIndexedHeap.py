@@ -0,0 +1,74 @@
+# Lazy-deletion heapq against IndexedMinHeap in dijkstra and primMST:
+# peak heap entries, peak traced memory and wall time.
+# Usage: python3 benchIndexedHeap.py [n] [m]
+import tracemalloc
+from heapq import heappush, heappop
+
+from weightedUndirectedGraph import Graph
+from heap import IndexedMinHeap
+from benchUtil import randomEdges, timed, argSizes
+
+
+def lazyHeapPeak(g, s):
+    # same relaxation loop as Graph.dijkstra, counting heap entries
+    dist = [float("inf")] * g.n
+    dist[s] = 0
+    q = [(0, s)]
+    peak = 1
+    while q:
+        priority, u = heappop(q)
+        if priority == dist[u]:
+            for w, weight in g.adjList[u]:
+                if priority + weight < dist[w]:
+                    dist[w] = priority + weight
+                    heappush(q, (dist[w], w))
+            peak = max(peak, len(q))
+    return peak
+
+
+def indexedHeapPeak(g, s):
+    dist = [float("inf")] * g.n
+    dist[s] = 0
+    q = IndexedMinHeap(g.n)
+    q.push(s, 0)
+    peak = 1
+    while q:
+        priority, u = q.pop()
+        for w, weight in g.adjList[u]:
+            if priority + weight < dist[w]:
+                dist[w] = priority + weight
+                q.push_or_decrease(w, dist[w])
+        peak = max(peak, len(q))
+    return peak
+
+
+def tracedPeak(f):
+    tracemalloc.start()
+    f()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def bench(name, run):
+    _, wall = timed(run)
+    print(f"  {name:<22} {wall:6.3f}s  "
+          f"peak traced {tracedPeak(run) / 2**10:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    n, m = (argSizes([2000, 400000]) + [400000])[:2]
+    g = Graph(n, randomEdges(n, m, weighted=True, maxWeight=10**6))
+
+    print(f"heap entries: lazy peak {lazyHeapPeak(g, 0)}, "
+          f"indexed peak {indexedHeapPeak(g, 0)} (n = {n}, m = {m})")
+
+    print("dijkstra")
+    bench("heapq (lazy)", lambda: g.dijkstra(0))
+    for d in (2, 4, 8):
+        bench(f"indexed, {d}-ary", lambda: g.dijkstra(0, True, d))
+
+    print("primAllVertices")
+    bench("heapq (lazy)", lambda: g.primAllVertices())
+    for d in (2, 4, 8):
+        bench(f"indexed, {d}-ary", lambda: g.primAllVertices(True, d))
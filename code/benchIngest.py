@@ -0,0 +1,46 @@
+# Graph(n, edges) after reading the whole edge file into a list,
+# against streaming the file into CSR with fromEdgeFile: ingestion
+# throughput and peak Python memory (tracemalloc).
+# Usage: python3 benchIngest.py [n] [m]
+import os
+import tempfile
+import tracemalloc
+
+import weightedUndirectedGraph
+from csrGraph import readEdges
+from benchUtil import randomEdges, timed, argSizes
+
+
+def peak(f, *args):
+    # a second run, since tracing slows the timed one down
+    tracemalloc.start()
+    f(*args)
+    _, peakBytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peakBytes
+
+
+if __name__ == "__main__":
+    n, m = (argSizes([100000, 500000]) + [500000])[:2]
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "edges.txt")
+        with open(path, "w") as f:
+            for u, v, w in randomEdges(n, m, weighted=True):
+                f.write(f"{u} {v} {w}\n")
+
+        Graph = weightedUndirectedGraph.Graph
+
+        def viaList():
+            return Graph(n, list(readEdges(path, weighted=True)), "csr")
+
+        _, listTime = timed(viaList)
+        listPeak = peak(viaList)
+        g, streamTime = timed(Graph.fromEdgeFile, path, n)
+        streamPeak = peak(Graph.fromEdgeFile, path, n)
+
+    final = g.adjList.nbytes() / 2 ** 20
+    print(f"final CSR          {final:8.1f} MiB")
+    print(f"list then Graph    {m / listTime / 1e6:8.2f} M edges/s  "
+          f"peak {listPeak / 2 ** 20:8.1f} MiB")
+    print(f"fromEdgeFile       {m / streamTime / 1e6:8.2f} M edges/s  "
+          f"peak {streamPeak / 2 ** 20:8.1f} MiB")
@@ -0,0 +1,30 @@
+# MST engines on a random weighted graph (1M edges by default):
+# kruskalMST, kruskalMSTArrays, primAllVertices and boruvkaMST
+# for pool sizes up to the CPU count.
+# Usage: python3 benchKruskal.py [n] [m]
+import os
+
+from weightedUndirectedGraph import Graph
+from benchUtil import randomEdges, timed, argSizes
+
+
+if __name__ == "__main__":
+    n, m = (argSizes([100000, 1000000]) + [1000000])[:2]
+    g = Graph(n, randomEdges(n, m, weighted=True, maxWeight=10**6))
+
+    (cost, mstEdges), kruskalTime = timed(g.kruskalMST)
+    (arrCost, arrays), arrTime = timed(g.kruskalMSTArrays)
+    (primCost, _), primTime = timed(g.primAllVertices)
+    assert cost == arrCost == primCost
+
+    print(f"MST: {len(mstEdges)} edges, cost {cost}")
+    print(f"kruskalMST        {kruskalTime:6.2f}s")
+    print(f"kruskalMSTArrays  {arrTime:6.2f}s  x{kruskalTime / arrTime:.1f}")
+    print(f"primAllVertices   {primTime:6.2f}s")
+
+    cpus = os.cpu_count()
+    for workers in sorted({2 ** i for i in range(cpus.bit_length())} | {cpus}):
+        (boruvkaCost, _), boruvkaTime = timed(g.boruvkaMST, workers)
+        assert boruvkaCost == cost
+        print(f"boruvkaMST x{workers:<3}   {boruvkaTime:6.2f}s"
+              f"  x{kruskalTime / boruvkaTime:.1f}")
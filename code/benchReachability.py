@@ -0,0 +1,39 @@
+# ReachabilityIndex against one Graph.dfs per query, on a random
+# directed graph, reporting the index build time and memory.
+# Usage: python3 benchReachability.py [n] [m] [queries]
+import random
+
+from directedGraph import Graph
+from benchUtil import randomEdges, timed, argSizes
+
+
+def dfsReaches(g, u, v):
+    visited = [False] * g.n
+    g.dfs(u, visited, [])
+    return visited[v]
+
+
+if __name__ == "__main__":
+    n, m, q = (argSizes([100000, 150000]) + [150000, 100000])[:3]
+    g = Graph(n, randomEdges(n, m))
+    rng = random.Random(251)
+    queries = [(rng.randrange(n), rng.randrange(n)) for _ in range(q)]
+
+    (comp, dag), condenseTime = timed(g.condensation)
+    index = g.reachabilityIndex()
+    print(f"condensation       {condenseTime:8.2f} s  ({len(dag)} SCCs)")
+    print(f"index build        {index.buildTime:8.2f} s  "
+          f"{index.nbytes() / 2 ** 20:.1f} MiB")
+
+    # per-query DFS is O(n + m), so only a sample of the queries
+    sample = queries[:20]
+    dfsAnswers, dfsTime = timed(lambda: [dfsReaches(g, u, v)
+                                         for u, v in sample])
+    answers, indexTime = timed(lambda: [index.reaches(u, v)
+                                        for u, v in queries])
+    assert answers[:len(sample)] == dfsAnswers
+    perDfs = dfsTime / len(sample)
+    perIndex = indexTime / len(queries)
+    print(f"dfs per query      {perDfs * 1e6:8.1f} us")
+    print(f"index per query    {perIndex * 1e6:8.1f} us  "
+          f"x{perDfs / perIndex:.0f}")
@@ -0,0 +1,47 @@
+# Point-to-point queries on a grid with random weights in [1, 10]:
+# vertices settled and time per query for each search.
+# A* uses the Manhattan distance, a lower bound since weights are >= 1.
+# Usage: python3 benchShortestPath.py [side] [queries]
+import random
+
+from weightedUndirectedGraph import Graph
+from benchUtil import timed, argSizes
+
+
+def gridGraph(side, seed=251):
+    rng = random.Random(seed)
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            v = r * side + c
+            if c + 1 < side:
+                edges.append([v, v + 1, rng.randint(1, 10)])
+            if r + 1 < side:
+                edges.append([v, v + side, rng.randint(1, 10)])
+    return Graph(side * side, edges, storage="csr")
+
+
+if __name__ == "__main__":
+    side, queries = (argSizes([300, 20]) + [20])[:2]
+    g = gridGraph(side)
+    rng = random.Random(0)
+    pairs = [(rng.randrange(g.n), rng.randrange(g.n)) for _ in range(queries)]
+
+    def manhattan(v, t):
+        return abs(v // side - t // side) + abs(v % side - t % side)
+
+    searches = [
+        ("dijkstra (all)", lambda s, t: (g.dijkstra(s)[0][t], None, g.n)),
+        ("shortestPath", g.shortestPath),
+        ("bidirectional", g.bidirectionalDijkstra),
+        ("aStar manhattan", lambda s, t: g.aStar(s, t, manhattan)),
+    ]
+    expected = None
+    for name, search in searches:
+        results, wall = timed(lambda: [search(s, t) for s, t in pairs])
+        dists = [r[0] for r in results]
+        assert expected is None or dists == expected
+        expected = dists
+        settled = sum(r[2] for r in results) / queries
+        print(f"{name:<16} {settled:10.0f} settled/query"
+              f"  {wall / queries * 1000:8.2f} ms/query")
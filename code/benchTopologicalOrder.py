@@ -0,0 +1,40 @@
+# Incremental addEdge against re-running kahnTopologicalSort after
+# every new edge, on a random DAG.
+# Usage: python3 benchTopologicalOrder.py [n] [m] [updates]
+import random
+
+from directedGraph import Graph
+from benchUtil import timed, argSizes
+
+
+def randomDagEdges(n, m, rng, rank):
+    # edges always go from lower to higher rank, so there is no cycle
+    edges = []
+    while len(edges) < m:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if rank[u] < rank[v]:
+            edges.append([u, v])
+    return edges
+
+
+if __name__ == "__main__":
+    n, m, k = (argSizes([100000, 500000]) + [500000, 1000])[:3]
+    rng = random.Random(251)
+    rank = list(range(n))
+    rng.shuffle(rank)
+    g = Graph(n, randomDagEdges(n, m, rng, rank))
+    updates = randomDagEdges(n, k, rng, rank)
+
+    _, initTime = timed(g.topologicalOrder)
+    _, kahnTime = timed(g.kahnTopologicalSort)
+
+    def addAll():
+        for u, v in updates:
+            g.addEdge(u, v)
+
+    _, addTime = timed(addAll)
+    assert all(g.precedes(u, v) for u, v in g.edges)
+    print(f"initial order        {initTime * 1000:8.2f} ms")
+    print(f"kahn per update      {kahnTime * 1000:8.2f} ms")
+    print(f"addEdge per update   {addTime / k * 1000:8.2f} ms"
+          f"  x{kahnTime / (addTime / k):.0f}")
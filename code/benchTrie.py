@@ -0,0 +1,31 @@
+# search_many / prefix_freq_many against one searchAsWholeWord /
+# searchFreqAsPrefix call per query.
+# Usage: python3 benchTrie.py [words] [queries]
+import random
+
+from trie import Trie
+from benchUtil import randomWords, timed, argSizes
+
+
+if __name__ == "__main__":
+    count, q = (argSizes([200000, 1000000]) + [1000000])[:2]
+    words = randomWords(count)
+    trie = Trie()
+    for w in words:
+        trie.insert(w)
+
+    # bursts of lookups: Zipf-popular words, cut to a random length
+    # so the burst mixes whole words, prefixes and misses
+    rng = random.Random(251)
+    popular = rng.choices(words, [1 / r for r in range(1, count + 1)], k=q)
+    queries = [w[:rng.randint(1, 12)] for w in popular]
+
+    for name, single, many in (
+            ("whole word", trie.searchAsWholeWord, trie.search_many),
+            ("prefix freq", trie.searchFreqAsPrefix, trie.prefix_freq_many)):
+        expected, loopTime = timed(lambda: [single(x) for x in queries])
+        got, manyTime = timed(many, queries)
+        assert got == expected
+        print(f"{name:<12} loop {q / loopTime / 1e6:5.2f} M/s  "
+              f"batched {q / manyTime / 1e6:5.2f} M/s  "
+              f"x{loopTime / manyTime:.2f}")
@@ -0,0 +1,33 @@
+# Trie.from_words against an insert loop over a sorted dictionary,
+# both with the collector on and off, so neither side gets it for free.
+# Usage: python3 benchTrieBuild.py [words]
+import gc
+
+from trie import Trie
+from benchUtil import randomWords, timed, argSizes
+
+
+def insertLoop(words):
+    trie = Trie()
+    for w in words:
+        trie.insert(w)
+    return trie
+
+
+if __name__ == "__main__":
+    count = argSizes([500000])[0]
+    words = sorted(randomWords(count))
+
+    for collector in ("on", "off"):
+        if collector == "off":
+            gc.disable()
+        trie, loopTime = timed(insertLoop, words)
+        bulk, bulkTime = timed(Trie.from_words, iter(words))
+        gc.enable()
+        sample = words[::97] + [w[:3] for w in words[::89]]
+        assert bulk.prefix_freq_many(sample) == \
+            trie.prefix_freq_many(sample)
+        assert bulk.complete("th") == trie.complete("th")
+        print(f"gc {collector:3}  insert loop {loopTime:6.2f} s  "
+              f"from_words {bulkTime:6.2f} s  x{loopTime / bulkTime:.2f}")
+        del trie, bulk
@@ -0,0 +1,39 @@
+# Bytes per word of Trie, RadixTrie and a minimized (DAWG) RadixTrie,
+# measured with tracemalloc, and their prefix lookup throughput.
+# Usage: python3 benchTrieMemory.py [words]
+import gc
+import random
+import tracemalloc
+
+from trie import Trie, RadixTrie
+from benchUtil import randomWords, timed, argSizes
+
+
+def build(cls, words, minimize=False):
+    tracemalloc.start()
+    trie = cls()
+    for w in words:
+        trie.insert(w)
+    if minimize:
+        trie.minimize()
+        gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return trie, size
+
+
+if __name__ == "__main__":
+    count = argSizes([200000])[0]
+    words = randomWords(count)
+    rng = random.Random(251)
+    queries = [rng.choice(words)[:rng.randint(1, 12)] for _ in range(200000)]
+
+    trie, trieBytes = build(Trie, words)
+    expected = [trie.searchFreqAsPrefix(q) for q in queries]
+    for name, t, size in (("Trie", trie, trieBytes),
+                          ("RadixTrie", *build(RadixTrie, words)),
+                          ("DAWG", *build(RadixTrie, words, True))):
+        got, secs = timed(lambda: [t.searchFreqAsPrefix(q) for q in queries])
+        assert got == expected
+        print(f"{name:<10} {size / count:7.1f} bytes/word  "
+              f"prefix freq {len(queries) / secs / 1e6:5.2f} M/s")
@@ -0,0 +1,63 @@
+# Building a Trie word by word against loading a FrozenTrie snapshot,
+# and lookups served from the mapped file by forked workers.
+# Usage: python3 benchTrieSnapshot.py [words] [queries]
+import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from trie import Trie, FrozenTrie
+from benchUtil import randomWords, timed, argSizes
+
+_trie = None  # per worker, set by _attach
+
+
+def _attach(path):
+    global _trie
+    _trie = FrozenTrie.load(path)
+
+
+def _lookup(queries):
+    return _trie.prefix_freq_many(queries)
+
+
+def build(words):
+    trie = Trie()
+    for w in words:
+        trie.insert(w)
+    return trie
+
+
+if __name__ == "__main__":
+    count, q = (argSizes([200000, 200000]) + [200000])[:2]
+    words = randomWords(count)
+    rng = random.Random(251)
+    queries = [rng.choice(words)[:rng.randint(1, 12)] for _ in range(q)]
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "trie.bin")
+
+        trie, buildTime = timed(build, words)
+        _, saveTime = timed(lambda: trie.freeze().save(path))
+        mapped, loadTime = timed(FrozenTrie.load, path)
+        print(f"insert loop    {buildTime:8.3f} s")
+        print(f"freeze + save  {saveTime:8.3f} s  "
+              f"{os.path.getsize(path) / count:.1f} bytes/word on disk")
+        print(f"load (mmap)    {loadTime * 1000:8.3f} ms  "
+              f"x{buildTime / loadTime:.0f}")
+
+        expected, trieTime = timed(lambda: [trie.searchFreqAsPrefix(x)
+                                            for x in queries])
+        got, mappedTime = timed(lambda: [mapped.searchFreqAsPrefix(x)
+                                         for x in queries])
+        assert got == expected
+        print(f"lookups, Trie  {q / trieTime / 1e6:8.2f} M/s")
+        print(f"lookups, mmap  {q / mappedTime / 1e6:8.2f} M/s")
+
+        # every worker maps the same file instead of building its own Trie
+        chunks = [queries[i::4] for i in range(4)]
+        with ProcessPoolExecutor(max_workers=2, initializer=_attach,
+                                 initargs=(path,)) as pool:
+            results, poolTime = timed(lambda: list(pool.map(_lookup, chunks)))
+        assert sorted(sum(results, [])) == sorted(expected)
+        print(f"2 workers      {poolTime:8.3f} s including startup")
+        del mapped
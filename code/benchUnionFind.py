@@ -0,0 +1,45 @@
+# Unions and finds per minute: one call per pair against the bulk API.
+# Usage: python3 benchUnionFind.py [n] [pairs]
+import os
+import random
+import tempfile
+
+from unionFind import UnionFind, IncrementalConnectivity
+from benchUtil import timed, argSizes
+
+
+def unionLoop(uf, pairs):
+    for p, q in pairs:
+        uf.unionByRank(p, q)
+
+
+if __name__ == "__main__":
+    n, k = (argSizes([1000000, 2000000]) + [2000000])[:2]
+    rng = random.Random(251)
+    pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(k)]
+    ids = [rng.randrange(n) for _ in range(k)]
+
+    def report(name, seconds):
+        print(f"{name:<28} {k / seconds * 60 / 1e6:8.1f} M/min")
+
+    uf = UnionFind(n)
+    _, t = timed(unionLoop, uf, pairs)
+    report("unionByRank loop", t)
+    _, t = timed(lambda: [uf.findPathCompression(p) for p in ids])
+    report("findPathCompression loop", t)
+
+    uf = UnionFind(n)
+    _, t = timed(uf.unionMany, pairs)
+    report("unionMany", t)
+    _, t = timed(uf.findMany, ids)
+    report("findMany", t)
+
+    ic = IncrementalConnectivity()
+    _, t = timed(ic.feed, iter(pairs))
+    report("IncrementalConnectivity.feed", t)
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "uf.bin")
+        _, saveTime = timed(ic.save, path)
+        _, loadTime = timed(IncrementalConnectivity.load, path)
+    print(f"snapshot: save {saveTime * 1000:.1f} ms,"
+          f" load {loadTime * 1000:.1f} ms ({ic.components} components)")
@@ -0,0 +1,78 @@
+import random
+import sys
+import time
+
+
+def randomEdges(n, m, weighted=False, maxWeight=100, seed=251):
+    """
+    Generates m random edges (self loops excluded) over n vertices
+    :param weighted: if True, each edge gets a weight in [1, maxWeight]
+    :return: list of [u, v] or [u, v, weight]
+    """
+    rng = random.Random(seed)
+    edges = []
+    while len(edges) < m:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u == v:
+            continue
+        if weighted:
+            edges.append([u, v, rng.randint(1, maxWeight)])
+        else:
+            edges.append([u, v])
+    return edges
+
+
+def randomWords(count, seed=251):
+    """
+    Generates count distinct lowercase words, 3 to 12 letters, with
+    letters drawn at English frequencies so that words share prefixes
+    roughly like a real dictionary does
+    :return: list of strings, in generation order
+    """
+    rng = random.Random(seed)
+    letters = "etaoinshrdlcumwfgypbvkjxqz"
+    weights = [12.7, 9.1, 8.2, 7.5, 7.0, 6.7, 6.3, 6.1, 6.0, 4.3, 4.0, 2.8,
+               2.8, 2.4, 2.4, 2.2, 2.0, 2.0, 1.9, 1.5, 1.0, 0.8, 0.2, 0.2,
+               0.1, 0.1]
+    words = set()
+    while len(words) < count:
+        length = rng.randint(3, 12)
+        words.add("".join(rng.choices(letters, weights, k=length)))
+    return list(words)
+
+
+def timed(f, *args, **kwargs):
+    """
+    Runs f once and reports the wall time
+    :return: (result of f, seconds elapsed)
+    """
+    start = time.perf_counter()
+    res = f(*args, **kwargs)
+    return res, time.perf_counter() - start
+
+
+def deepSizeof(obj, seen=None):
+    """
+    Approximate memory footprint of nested lists/tuples of numbers,
+    counting every distinct object once
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple)):
+        for item in obj:
+            size += deepSizeof(item, seen)
+    return size
+
+
+def argSizes(default):
+    """
+    Reads benchmark sizes from the command line,
+    e.g. `python3 benchX.py 1000 5000`, falling back to default
+    """
+    if len(sys.argv) > 1:
+        return [int(a) for a in sys.argv[1:]]
+    return default
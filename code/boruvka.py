@@ -0,0 +1,156 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from unionFind import UnionFind
+
+# Per worker process state, set once by _attach
+_shm = None
+_us = _vs = _ws = _ids = _comp = None
+
+
+def _views(buf, n, m, weightCode):
+    # us, vs, ws, ids (m entries each) then comp (n entries), back to back
+    mv = memoryview(buf)
+    us = mv[:8 * m].cast("q")
+    vs = mv[8 * m:16 * m].cast("q")
+    ws = mv[16 * m:24 * m].cast(weightCode)
+    ids = mv[24 * m:32 * m].cast("q")
+    comp = mv[32 * m:32 * m + 8 * n].cast("q")
+    return us, vs, ws, ids, comp
+
+
+def _attach(spec):
+    global _shm, _us, _vs, _ws, _ids, _comp
+    name, n, m, weightCode = spec
+    _shm = SharedMemory(name=name)
+    _us, _vs, _ws, _ids, _comp = _views(_shm.buf, n, m, weightCode)
+
+
+def _cheapest(lo, hi):
+    # Cheapest edge leaving every component, over edges lo..hi-1.
+    # Ties go to the smallest original edge id: ids increase along a
+    # partition and only a strictly smaller weight replaces the best,
+    # so all workers agree on one total order (weight, id), which keeps
+    # the chosen edges cycle free.
+    # Edges that became internal to a component are dropped by moving
+    # the surviving ones to the front of the partition, which is owned
+    # by this task alone, so later rounds scan fewer edges.
+    us, vs, ws, ids, comp = _us, _vs, _ws, _ids, _comp
+    bestWeight, bestAt = {}, {}
+    get = bestWeight.get
+    inf = float("inf")
+    k = lo
+    for i, u, v, w in zip(range(lo, hi), us[lo:hi], vs[lo:hi], ws[lo:hi]):
+        cu, cv = comp[u], comp[v]
+        if cu == cv:
+            continue
+        if k != i:
+            us[k], vs[k], ws[k], ids[k] = u, v, w, ids[i]
+        if w < get(cu, inf):
+            bestWeight[cu] = w
+            bestAt[cu] = k
+        if w < get(cv, inf):
+            bestWeight[cv] = w
+            bestAt[cv] = k
+        k += 1
+
+    best = {c: (ws[i], ids[i], us[i], vs[i]) for c, i in bestAt.items()}
+    return best, k
+
+
+def boruvkaMST(n, edges, workers=None):
+    """
+    Boruvka's MST: every round, each component picks its cheapest
+    outgoing edge and all of them are contracted at once with UnionFind.
+    The cheapest-edge scan is split into edge partitions over a process
+    pool; the edges and the component labels live in shared memory,
+    so a round only sends (lo, hi) ranges to the workers.
+    :param edges: [u, v, weight] list, as in weightedUndirectedGraph
+    :param workers: pool size, defaults to the number of CPUs
+    :return: (cost, mstEdges) like primAllVertices and kruskalMST
+    """
+    m = len(edges)
+    workers = workers or os.cpu_count()
+    isInt = all(isinstance(e[2], int) for e in edges)
+    weightCode = "q" if isInt else "d"
+
+    shm = SharedMemory(create=True, size=max(32 * m + 8 * n, 1))
+    us, vs, ws, ids, comp = _views(shm.buf, n, m, weightCode)
+    us[:] = array("q", [e[0] for e in edges])
+    vs[:] = array("q", [e[1] for e in edges])
+    ws[:] = array(weightCode, [e[2] for e in edges])
+    ids[:] = array("q", range(m))
+    comp[:] = array("q", range(n))
+
+    step = -(-m // (4 * workers)) or 1  # a few partitions per worker
+    parts = [(lo, min(lo + step, m)) for lo in range(0, m, step)]
+
+    uf = UnionFind(n)
+    cost = 0
+    mstEdges = []
+    try:
+        spec = (shm.name, n, m, weightCode)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(spec,)) as pool:
+            while True:
+                futures = [(lo, pool.submit(_cheapest, lo, hi))
+                           for lo, hi in parts]
+                best = {}
+                newParts = []
+                for lo, future in futures:
+                    partBest, hi = future.result()
+                    if hi > lo:
+                        newParts.append((lo, hi))
+                    for c, key in partBest.items():
+                        if c not in best or key < best[c]:
+                            best[c] = key
+                parts = newParts
+                if not best:  # no edge leaves any component
+                    break
+
+                # two components may pick the same edge, hence the set
+                for weight, _, u, v in sorted(set(best.values())):
+                    if uf.findPathHalving(u) != uf.findPathHalving(v):
+                        uf.unionBySize(u, v)
+                        cost += weight
+                        mstEdges.append((u, v, weight))
+
+                for x in range(n):
+                    comp[x] = uf.findPathHalving(x)
+    finally:
+        # the views must be released before the block can be closed
+        del us, vs, ws, ids, comp
+        shm.close()
+        shm.unlink()
+
+    return cost, mstEdges
+
+
+def testBoruvka():
+    edges = [
+        [0, 1, 7],
+        [0, 2, 6],
+        [1, 4, 5],
+        [1, 3, 1],
+        [2, 3, 9],
+        [2, 5, 4],
+        [3, 5, 8],
+        [3, 6, 2],
+        [4, 6, 9],
+        [5, 6, 3]
+    ]
+    cost, mstEdges = boruvkaMST(7, edges, workers=2)
+    print(cost, mstEdges)  # 21 and 6 edges
+    assert cost == 21 and len(mstEdges) == 6
+
+    # disconnected, node 5 and 6 are alone
+    cost, mstEdges = boruvkaMST(7, [[0, 1, 2], [0, 2, 3], [3, 4, 4]])
+    assert cost == 9 and len(mstEdges) == 3
+
+    assert boruvkaMST(3, []) == (0, [])
+
+
+if __name__ == "__main__":
+    testBoruvka()
@@ -0,0 +1,371 @@
+import mmap
+import os
+import struct
+import tempfile
+import time
+from array import array
+from itertools import islice
+from multiprocessing.shared_memory import SharedMemory
+
+
+class CSR:
+    # Compressed sparse row adjacency.
+    # The neighbors of u are targets[offsets[u]:offsets[u + 1]],
+    # and the matching slice of weights holds their edge weights.
+    # csr[u] behaves like adjList[u], so the traversals written against
+    # the list-of-lists adjacency run on it unchanged.
+    # On disk (save/load): a 32 byte header, magic, directed flag,
+    # weight typecode, n and m, followed by the fromBuffer layout.
+    MAGIC = b"CSR1"
+    HEADER = struct.Struct("<4sBc2xqq8x")
+
+    def __init__(self, n, offsets, targets, weights=None):
+        self.n = n
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        # set by load: the mapped file, which must outlive the arrays
+        self.path = None
+        self._map = None
+
+        # memoryview slices do not copy the underlying buffer
+        self._targets = memoryview(targets)
+        self._weights = None if weights is None else memoryview(weights)
+
+    @classmethod
+    def fromEdges(cls, n, edges, directed=True, weighted=False):
+        """
+        Builds the CSR arrays from an edge list in two passes:
+        count the out-degree of every vertex, then place each edge
+        :param n: number of vertices
+        :param edges: [u, v] or [u, v, weight] pairs
+        :param directed: if False, every edge is stored in both directions
+        :param weighted: if True, the third column of each edge is kept
+        """
+        # First pass: degree count, shifted by one so that
+        # the prefix sum directly yields the offsets
+        offsets = array("q", bytes(8 * (n + 1)))
+        isInt = True
+        for e in edges:
+            offsets[e[0] + 1] += 1
+            if not directed:
+                offsets[e[1] + 1] += 1
+            if weighted and not isinstance(e[2], int):
+                isInt = False
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+
+        # Second pass: fill, using a moving cursor per vertex
+        m = offsets[n]
+        targets = array("q", bytes(8 * m))
+        weights = None
+        if weighted:
+            weights = array("q" if isInt else "d", bytes(8 * m))
+        cursor = offsets[:-1]
+        for e in edges:
+            u, v = e[0], e[1]
+            targets[cursor[u]] = v
+            if weighted:
+                weights[cursor[u]] = e[2]
+            cursor[u] += 1
+            if not directed:
+                targets[cursor[v]] = u
+                if weighted:
+                    weights[cursor[v]] = e[2]
+                cursor[v] += 1
+
+        return cls(n, offsets, targets, weights)
+
+    @classmethod
+    def fromEdgeStream(cls, edges, n=None, directed=True, weighted=False,
+                       batchSize=65536):
+        """
+        fromEdges for an edge iterator or generator that is read once,
+        batchSize edges at a time, so no edge list is ever materialized.
+        The first pass counts degrees and spools every batch as raw
+        columns to a temporary file; the second pass reads the spool
+        back batch by batch and fills the arrays. Peak memory is the
+        final CSR plus one batch.
+        Weights are spooled as float64 and stored as "q" again if they
+        were all ints, so int weights must stay below 2^53.
+        :param n: number of vertices, or None to take the largest id + 1
+        :return: CSR, with edgesRead and buildTime (seconds) set
+        """
+        start = time.perf_counter()
+        edges = iter(edges)
+        degree = array("q", bytes(8 * ((n or 0) + 1)))
+        isInt = True
+        edgesRead = 0
+
+        with tempfile.TemporaryFile() as spool:
+            sizes = []
+            while True:
+                batch = list(islice(edges, batchSize))
+                if not batch:
+                    break
+                us = array("q", [e[0] for e in batch])
+                vs = array("q", [e[1] for e in batch])
+                highest = max(max(us), max(vs)) + 2
+                if highest > len(degree):
+                    degree.extend(array("q", [0]) * (highest - len(degree)))
+                for u in us:
+                    degree[u + 1] += 1
+                if not directed:
+                    for v in vs:
+                        degree[v + 1] += 1
+                us.tofile(spool)
+                vs.tofile(spool)
+                if weighted:
+                    isInt = isInt and all(isinstance(e[2], int)
+                                          for e in batch)
+                    array("d", [e[2] for e in batch]).tofile(spool)
+                sizes.append(len(batch))
+                edgesRead += len(batch)
+
+            if n is None:
+                n = len(degree) - 1
+            elif len(degree) > n + 1:
+                raise ValueError(f"edge endpoint {len(degree) - 2} "
+                                 f"out of range for n={n}")
+            offsets = degree
+            for u in range(n):
+                offsets[u + 1] += offsets[u]
+
+            m = offsets[n]
+            targets = array("q", bytes(8 * m))
+            weights = None
+            if weighted:
+                weights = array("q" if isInt else "d", bytes(8 * m))
+            cursor = offsets[:-1]
+            spool.seek(0)
+            for size in sizes:
+                us, vs, ws = array("q"), array("q"), array("d")
+                us.fromfile(spool, size)
+                vs.fromfile(spool, size)
+                if weighted:
+                    ws.fromfile(spool, size)
+                    if isInt:
+                        ws = array("q", [int(w) for w in ws])
+                for i in range(size):
+                    u, v = us[i], vs[i]
+                    targets[cursor[u]] = v
+                    if weighted:
+                        weights[cursor[u]] = ws[i]
+                    cursor[u] += 1
+                    if not directed:
+                        targets[cursor[v]] = u
+                        if weighted:
+                            weights[cursor[v]] = ws[i]
+                        cursor[v] += 1
+
+        csr = cls(n, offsets, targets, weights)
+        csr.edgesRead = edgesRead
+        csr.buildTime = time.perf_counter() - start
+        return csr
+
+    @classmethod
+    def fromBuffer(cls, buf, n, m, weightCode=None):
+        """
+        Wraps CSR arrays stored back to back in buf without copying:
+        n + 1 offsets, m targets, then m weights if weightCode is given
+        :param buf: any writable or read-only bytes-like object
+                    (shared memory, mmap, bytearray)
+        :param weightCode: "q" for int weights, "d" for float weights
+        """
+        mv = memoryview(buf)
+        targetsAt = 8 * (n + 1)
+        weightsAt = targetsAt + 8 * m
+        offsets = mv[:targetsAt].cast("q")
+        targets = mv[targetsAt:weightsAt].cast("q")
+        weights = None
+        if weightCode is not None:
+            weights = mv[weightsAt:weightsAt + 8 * m].cast(weightCode)
+        return cls(n, offsets, targets, weights)
+
+    def weightCode(self):
+        return None if self.weights is None else self._weights.format
+
+    def writeInto(self, buf):
+        """
+        Copies offsets, targets and weights back to back into buf,
+        in the layout read by fromBuffer
+        """
+        mv = memoryview(buf)
+        at = 0
+        for arr in (self.offsets, self.targets, self.weights):
+            if arr is not None:
+                raw = memoryview(arr).cast("B")
+                mv[at:at + len(raw)] = raw
+                at += len(raw)
+
+    def toSharedMemory(self):
+        """
+        Copies the CSR arrays into one shared memory block,
+        so worker processes can attach to them instead of unpickling
+        :return: (shm, spec); the owner keeps shm alive and unlinks it,
+                 workers call CSR.fromSharedMemory(spec)
+        """
+        shm = SharedMemory(create=True, size=max(self.nbytes(), 1))
+        self.writeInto(shm.buf)
+        spec = (shm.name, self.n, len(self.targets), self.weightCode())
+        return shm, spec
+
+    @classmethod
+    def fromSharedMemory(cls, spec):
+        """
+        Attaches to a block made by toSharedMemory
+        :return: (shm, csr); shm must stay referenced while csr is used
+        """
+        name, n, m, weightCode = spec
+        shm = SharedMemory(name=name)
+        return shm, cls.fromBuffer(shm.buf, n, m, weightCode)
+
+    def save(self, path, directed=True):
+        with open(path, "wb") as f:
+            weightCode = (self.weightCode() or "\0").encode()
+            f.write(self.HEADER.pack(self.MAGIC, directed, weightCode,
+                                     self.n, len(self.targets)))
+            for arr in (self.offsets, self.targets, self.weights):
+                if arr is not None:
+                    f.write(memoryview(arr).cast("B"))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Maps a file written by save, read only. Nothing is parsed or
+        copied: the arrays are views of the mapping and pages are read
+        on first touch. Processes that map the same file share its
+        pages through the OS page cache.
+        :return: (csr, directed)
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, directed, weightCode, n, m = cls.HEADER.unpack_from(mapped)
+        if magic != cls.MAGIC:
+            mapped.close()
+            raise ValueError(f"{path} is not a CSR file")
+        weightCode = None if weightCode == b"\0" else weightCode.decode()
+        body = memoryview(mapped)[cls.HEADER.size:]
+        csr = cls.fromBuffer(body, n, m, weightCode)
+        csr.path = path
+        csr._map = mapped
+        return csr, bool(directed)
+
+    def transposed(self):
+        # Reversed edges as a new CSR, counting and filling straight
+        # from the arrays (weights follow their edges)
+        n, offsets, targets = self.n, self.offsets, self.targets
+        tOffsets = array("q", bytes(8 * (n + 1)))
+        for v in targets:
+            tOffsets[v + 1] += 1
+        for u in range(n):
+            tOffsets[u + 1] += tOffsets[u]
+
+        m = len(targets)
+        tTargets = array("q", bytes(8 * m))
+        tWeights = None
+        if self.weights is not None:
+            tWeights = array(self.weightCode(), bytes(8 * m))
+        cursor = tOffsets[:-1]
+        for u in range(n):
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                tTargets[cursor[v]] = u
+                if tWeights is not None:
+                    tWeights[cursor[v]] = self.weights[i]
+                cursor[v] += 1
+        return CSR(n, tOffsets, tTargets, tWeights)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, u):
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        if self._weights is None:
+            return self._targets[lo:hi]
+        return zip(self._targets[lo:hi], self._weights[lo:hi])
+
+    def __iter__(self):
+        for u in range(self.n):
+            yield self[u]
+
+    def degree(self, u):
+        return self.offsets[u + 1] - self.offsets[u]
+
+    def nbytes(self):
+        total = self.offsets.itemsize * len(self.offsets)
+        total += self.targets.itemsize * len(self.targets)
+        if self.weights is not None:
+            total += self.weights.itemsize * len(self.weights)
+        return total
+
+
+def readEdges(path, sep=None, weighted=False):
+    """
+    Lazily parses a text edge list, one "u v" or "u v weight" per line
+    (sep="," for CSV). Blank lines and lines starting with # are skipped.
+    Weights are int when they parse as one, float otherwise.
+    :return: generator of [u, v] or [u, v, weight]
+    """
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split(sep)
+            if not weighted:
+                yield [int(fields[0]), int(fields[1])]
+                continue
+            try:
+                w = int(fields[2])
+            except ValueError:
+                w = float(fields[2])
+            yield [int(fields[0]), int(fields[1]), w]
+
+
+def testCSR():
+    from fileUtil import savedCopy
+
+    csr = CSR.fromEdges(3, [[0, 1], [1, 2], [0, 2]])
+    assert [list(row) for row in csr] == [[1, 2], [2], []]
+
+    csr = CSR.fromEdges(3, [[0, 1], [1, 2], [0, 2]], directed=False)
+    assert [list(row) for row in csr] == [[1, 2], [0, 2], [1, 0]]
+
+    csr = CSR.fromEdges(3, [[0, 1, 5], [1, 2, 1]], directed=False,
+                        weighted=True)
+    assert list(csr[1]) == [(0, 5), (2, 1)]
+    assert csr.degree(1) == 2
+    print(csr.nbytes())  # 4 * 8 + 4 * 8 + 4 * 8 = 96
+
+    buf = bytearray(csr.nbytes())
+    csr.writeInto(buf)
+    copy = CSR.fromBuffer(buf, 3, 4, csr.weightCode())
+    assert [list(row) for row in copy] == [list(row) for row in csr]
+
+    csr = CSR.fromEdges(3, [[0, 1, 5], [1, 2, 1.5], [0, 2, 2]], weighted=True)
+    assert [list(row) for row in csr.transposed()] == [[], [(0, 5)],
+                                                       [(0, 2), (1, 1.5)]]
+
+    with savedCopy(csr, CSR.load) as (mapped, directed):
+        assert directed and mapped.weightCode() == "d"
+        assert [list(row) for row in mapped] == [list(row) for row in csr]
+        del mapped
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "g.csv")
+        with open(path, "w") as f:
+            f.write("# u,v,weight\n0,1,5\n\n1,2,1.5\n0,2,2\n")
+        streamed = CSR.fromEdgeStream(readEdges(path, ",", weighted=True),
+                                      weighted=True, batchSize=2)
+    assert streamed.n == 3 and streamed.edgesRead == 3
+    assert [list(row) for row in streamed] == [list(row) for row in csr]
+    streamed = CSR.fromEdgeStream(iter([[0, 1, 5], [1, 3, 1]]), n=5,
+                                  directed=False, weighted=True)
+    assert streamed.weightCode() == "q" and list(streamed[1]) == [(0, 5),
+                                                                  (3, 1)]
+    assert len(streamed) == 5
+
+
+if __name__ == "__main__":
+    testCSR()
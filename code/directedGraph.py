@@ -1,31 +1,119 @@
+from array import array
 from collections import deque
+from csrGraph import CSR, readEdges
+from floydWarshall import (floydWarshallPython, floydWarshallNumpy,
+                           floydWarshallBlocked, distanceMatrix)
+from reachability import ReachabilityIndex
 
 
 class Graph:
     # e.g.,: Graph(n = 3, edges = [[0,1],[1,2],[0,2]])
     # creates a graph with 3 nodes indexed 0, 1, 2,
     # with 0 -> 1, 0 -> 2, 1 -> 2
-    def __init__(self, n: int, edges: list[list[int]]):
+    # storage="csr" keeps the adjacency in flat arrays (see csrGraph.py)
+    def __init__(self, n: int, edges: list[list[int]], storage="list"):
         self.n = n
-        self.edges = edges
+        self._edges = list(edges)  # addEdge appends to our own copy
+        self.storage = storage
 
-        self.adjList = [[] for _ in range(n)]
-        for u, v in edges:
-            self.adjList[u].append(v)
+        if storage == "csr":
+            self.adjList = CSR.fromEdges(n, edges)
+        else:
+            self.adjList = [[] for _ in range(n)]
+            for u, v in edges:
+                self.adjList[u].append(v)
 
-        self.adjMatrix = [[float("inf") for _ in range(n)] for _ in range(n)]
-        for i in range(v):
-            self.adjMatrix[i][i] = 0
-        for u, v in edges:
-            self.adjMatrix[u][v] = 1
+        self._adjMatrix = None
+
+        # incremental topological order, see addEdge
+        self._inList = None
+        self._order = None
+        self._pos = None
+
+        # SCC condensation, see condensation
+        self._comp = None
+        self._dagAdj = None
+        self._dag = None
+        self._reach = None
+
+    @classmethod
+    def fromCSR(cls, csr):
+        # Wraps an adjacency that is already in CSR form (e.g. mapped
+        # by load); the edge list is only rebuilt if something asks for it
+        g = cls(0, [], storage="csr")
+        g.n = csr.n
+        g._edges = None
+        g.adjList = csr
+        return g
+
+    @classmethod
+    def fromEdgeStream(cls, edges, n=None, batchSize=65536):
+        # CSR storage built from an edge iterator read once in batches,
+        # without an edge list; see CSR.fromEdgeStream. adjList.edgesRead
+        # and adjList.buildTime give the ingestion throughput
+        csr = CSR.fromEdgeStream(edges, n, batchSize=batchSize)
+        return cls.fromCSR(csr)
+
+    @classmethod
+    def fromEdgeFile(cls, path, n=None, sep=None, batchSize=65536):
+        # streams a text or CSV (sep=",") edge list, see readEdges
+        return cls.fromEdgeStream(readEdges(path, sep), n, batchSize)
+
+    def save(self, path):
+        # binary CSR file, see CSR.save
+        csr = self.adjList if self.storage == "csr" else \
+            CSR.fromEdges(self.n, self.edges)
+        csr.save(path, directed=True)
+
+    @classmethod
+    def load(cls, path):
+        # memory-maps a file written by save, in milliseconds at any size
+        csr, directed = CSR.load(path)
+        if not directed or csr.weights is not None:
+            raise ValueError(f"{path} does not hold an unweighted "
+                             "directed graph")
+        return cls.fromCSR(csr)
+
+    @property
+    def edges(self):
+        # removeEdge drops the cached edge list, it is rebuilt from adjList
+        # the next time a whole-graph algorithm reads it
+        if self._edges is None:
+            self._edges = [[u, v] for u in range(self.n)
+                           for v in self.adjList[u]]
+        return self._edges
+
+    @property
+    def adjMatrix(self):
+        # The O(n^2) matrix is only built on first access,
+        # so graphs that never use it are O(n + m) to construct
+        if self._adjMatrix is None:
+            mat = [[float("inf")] * self.n for _ in range(self.n)]
+            for i in range(self.n):
+                mat[i][i] = 0
+            for u, v in self.edges:
+                if u != v:  # a self-loop leaves the 0 diagonal alone
+                    mat[u][v] = 1
+            self._adjMatrix = mat
+        return self._adjMatrix
 
     def dfs(self, v, visited, path):
+        # Explicit stack of neighbor iterators in place of the call stack,
+        # so deep graphs do not hit the recursion limit. Resuming the
+        # iterator on top visits vertices in the same order as recursion.
         visited[v] = True
         path.append(v)
+        st = [iter(self.adjList[v])]
 
-        for w in self.adjList[v]:
-            if not visited[w]:
-                self.dfs(w, visited, path)
+        while st:
+            for w in st[-1]:
+                if not visited[w]:
+                    visited[w] = True
+                    path.append(w)
+                    st.append(iter(self.adjList[w]))
+                    break
+            else:  # every neighbor is visited, "return" from v
+                st.pop()
 
     def kojaraju(self):
         # Run DFS to make a stack of vertices based on exit time
@@ -33,19 +121,31 @@ class Graph:
         indegreePriorityStack = []
 
         def visit(v):
+            # same explicit stack as dfs, v is pushed when it exits
             visited[v] = True
+            st = [(v, iter(self.adjList[v]))]
 
-            for w in self.adjList[v]:
-                if not visited[w]:
-                    visit(w)
-            indegreePriorityStack.append(v)
+            while st:
+                u, neighbors = st[-1]
+                for w in neighbors:
+                    if not visited[w]:
+                        visited[w] = True
+                        st.append((w, iter(self.adjList[w])))
+                        break
+                else:
+                    st.pop()
+                    indegreePriorityStack.append(u)
 
         for v in range(self.n):
             if not visited[v]:
                 visit(v)
 
         # DFS on the transposed graph, in the order of exit time
-        transposedG = Graph(self.n, [[v, u] for u, v in self.edges])
+        if self.storage == "csr":
+            # straight from the arrays, without an edge list
+            transposedG = Graph.fromCSR(self.adjList.transposed())
+        else:
+            transposedG = Graph(self.n, [[v, u] for u, v in self.edges])
         visitedTranspose = [False] * self.n
         scc = []
         while indegreePriorityStack:
@@ -57,6 +157,297 @@ class Graph:
 
         return scc
 
+    def tarjan(self):
+        return [sorted(component) for component in self._sccs()]
+
+    def _sccs(self):
+        # Single pass SCC, without building the transposed graph.
+        # index[v] is the DFS discovery order and low[v] the smallest index
+        # reachable from v's subtree through vertices still on the stack.
+        # v is the root of an SCC when low[v] == index[v].
+        # Components come out unsorted, sinks of the condensation first.
+        index = [-1] * self.n
+        low = [0] * self.n
+        onStack = [False] * self.n
+        stack = []
+        counter = 0
+
+        for root in range(self.n):
+            if index[root] != -1:
+                continue
+
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            onStack[root] = True
+            st = [(root, iter(self.adjList[root]))]
+
+            while st:
+                v, neighbors = st[-1]
+                for w in neighbors:
+                    if index[w] == -1:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        onStack[w] = True
+                        st.append((w, iter(self.adjList[w])))
+                        break
+                    elif onStack[w]:
+                        low[v] = min(low[v], index[w])
+                else:
+                    st.pop()
+                    if st:
+                        parent = st[-1][0]
+                        low[parent] = min(low[parent], low[v])
+                    if low[v] == index[v]:
+                        component = []
+                        while True:
+                            w = stack.pop()
+                            onStack[w] = False
+                            component.append(w)
+                            if w == v:
+                                break
+                        yield component
+
+    # Cached SCC condensation.
+    # comp[v] is the id of the SCC holding v and the condensed DAG has
+    # one vertex per SCC. _dagAdj[a] maps every successor b of a to the
+    # number of graph edges going from SCC a to SCC b, so addEdge and
+    # removeEdge can update it without looking at the rest of the graph.
+    def condensation(self):
+        """
+        :return: (comp, dag) with comp an array("q") of SCC ids per vertex
+                 and dag the condensed DAG as a CSR over those ids.
+                 Right after a full build the ids are in topological
+                 order; edges added later may break that.
+        """
+        if self._comp is None:
+            components = list(self._sccs())
+            c = len(components)
+            comp = array("q", bytes(8 * self.n))
+            # Tarjan finishes sinks first, so count the ids down
+            for i, component in enumerate(components):
+                for v in component:
+                    comp[v] = c - 1 - i
+
+            dagAdj = [{} for _ in range(c)]
+            for u in range(self.n):
+                cu = comp[u]
+                for v in self.adjList[u]:
+                    cv = comp[v]
+                    if cu != cv:
+                        dagAdj[cu][cv] = dagAdj[cu].get(cv, 0) + 1
+            self._comp, self._dagAdj, self._dag = comp, dagAdj, None
+
+        if self._dag is None:
+            self._dag = CSR.fromEdges(len(self._dagAdj),
+                                      [[a, b] for a in range(len(self._dagAdj))
+                                       for b in self._dagAdj[a]])
+        return self._comp, self._dag
+
+    def reaches(self, u, v):
+        # With a reachability index built this is a binary search,
+        # otherwise a DFS over the condensed DAG, which is usually much
+        # smaller than the graph; vertices of one SCC reach each other
+        if self._reach is not None:
+            return self._reach.reaches(u, v)
+        comp, _ = self.condensation()
+        return self._dagReaches(comp[u], comp[v])
+
+    def reachabilityIndex(self):
+        """
+        Builds (once) the interval label index of reachability.py, for
+        many queries on a graph that no longer changes; any addEdge or
+        removeEdge drops it
+        :return: ReachabilityIndex, with buildTime and nbytes()
+        """
+        if self._reach is None:
+            self._reach = ReachabilityIndex(*self.condensation())
+        return self._reach
+
+    def _dagReaches(self, a, b):
+        if a == b:
+            return True
+        dagAdj = self._dagAdj
+        seen = {a}
+        st = [a]
+        while st:
+            for c in dagAdj[st.pop()]:
+                if c == b:
+                    return True
+                if c not in seen:
+                    seen.add(c)
+                    st.append(c)
+        return False
+
+    def _condensationAdd(self, u, v):
+        cu, cv = self._comp[u], self._comp[v]
+        if cu == cv:
+            return
+        succ = self._dagAdj[cu]
+        if cv in succ:
+            succ[cv] += 1
+        elif self._dagReaches(cv, cu):
+            # the new edge closes a cycle of SCCs, which merge into one
+            self._comp = self._dagAdj = self._dag = None
+        else:
+            succ[cv] = 1
+            self._dag = None
+
+    def _condensationRemove(self, u, v):
+        cu, cv = self._comp[u], self._comp[v]
+        if cu == cv:
+            # the SCC may split
+            self._comp = self._dagAdj = self._dag = None
+            return
+        succ = self._dagAdj[cu]
+        succ[cv] -= 1
+        if succ[cv] == 0:
+            del succ[cv]
+            self._dag = None
+
+    def floydWarshall(self, engine="python", withPrev=False, blockSize=64):
+        # All-pairs hop counts; same engines as the weighted Graph
+        if engine == "python":
+            return floydWarshallPython(self.adjMatrix, withPrev)
+        dist = distanceMatrix(self.n, self.edges, weighted=False)
+        if engine == "blocked":
+            return floydWarshallBlocked(dist, withPrev, blockSize)
+        return floydWarshallNumpy(dist, withPrev)
+
+    # Incremental topological order (Pearce-Kelly).
+    # topologicalOrder() computes the order once with Kahn's algorithm.
+    # After that, addEdge(u, v) only repairs the slice of the order
+    # between v and u, so an update costs time proportional to the
+    # vertices in that slice that are connected to u or v, not O(n + m).
+    def topologicalOrder(self):
+        """
+        :return: the maintained topological order (do not modify it)
+        """
+        if self._order is None:
+            order = self.kahnTopologicalSort()
+            if len(order) != self.n:
+                raise ValueError("graph has a cycle")
+            self._order = order
+            self._pos = [0] * self.n
+            for i, v in enumerate(order):
+                self._pos[v] = i
+        return self._order
+
+    def precedes(self, u, v):
+        self.topologicalOrder()
+        return self._pos[u] < self._pos[v]
+
+    def _predecessors(self):
+        if self._inList is None:
+            self._inList = [[] for _ in range(self.n)]
+            for u in range(self.n):
+                for v in self.adjList[u]:
+                    self._inList[v].append(u)
+        return self._inList
+
+    def addEdge(self, u, v):
+        """
+        Adds u -> v, keeping the topological order once topologicalOrder
+        has been called and the condensation once it has been built
+        :raises ValueError: if the order is kept and u -> v would close
+                            a cycle, in which case the graph is left
+                            unchanged
+        """
+        if self.storage != "list":
+            raise ValueError("addEdge needs storage=\"list\"")
+        inList = self._predecessors()
+
+        if self._order is not None and u == v:
+            raise ValueError(f"edge {u} -> {v} closes a cycle")
+        if self._order is not None and self._pos[v] <= self._pos[u]:
+            order, pos = self._order, self._pos
+            lower, upper = pos[v], pos[u]
+
+            # vertices reachable from v that sit before u in the order;
+            # reaching u itself means the new edge closes a cycle
+            forward = [v]
+            seen = {v}
+            st = [v]
+            while st:
+                x = st.pop()
+                for w in self.adjList[x]:
+                    if w == u:
+                        raise ValueError(f"edge {u} -> {v} closes a cycle")
+                    if w not in seen and pos[w] < upper:
+                        seen.add(w)
+                        forward.append(w)
+                        st.append(w)
+
+            # vertices that reach u and sit after v in the order
+            backward = [u]
+            seen = {u}
+            st = [u]
+            while st:
+                x = st.pop()
+                for w in inList[x]:
+                    if w not in seen and pos[w] > lower:
+                        seen.add(w)
+                        backward.append(w)
+                        st.append(w)
+
+            # reuse the same positions, with everything that reaches u
+            # placed before everything reachable from v
+            forward.sort(key=pos.__getitem__)
+            backward.sort(key=pos.__getitem__)
+            moved = backward + forward
+            slots = sorted(pos[x] for x in moved)
+            for x, i in zip(moved, slots):
+                pos[x] = i
+                order[i] = x
+
+        self.adjList[u].append(v)
+        inList[v].append(u)
+        if self._edges is not None:
+            self._edges.append([u, v])
+        self._adjMatrix = None
+        self._reach = None
+        if self._comp is not None:
+            self._condensationAdd(u, v)
+
+    def removeEdge(self, u, v):
+        # removing an edge never invalidates a topological order
+        if self.storage != "list":
+            raise ValueError("removeEdge needs storage=\"list\"")
+        self.adjList[u].remove(v)
+        if self._inList is not None:
+            self._inList[v].remove(u)
+        self._edges = None
+        self._adjMatrix = None
+        self._reach = None
+        if self._comp is not None:
+            self._condensationRemove(u, v)
+
+    def topologicalWaves(self):
+        # Kahn's algorithm one level at a time: wave i holds the vertices
+        # whose indegree reaches zero once waves 0..i-1 are removed,
+        # i.e. everything that can run in parallel at step i.
+        # [] if the graph is not a DAG, like kahnTopologicalSort
+        indeg = [0] * self.n
+        for u, v in self.edges:
+            indeg[v] += 1
+
+        wave = [v for v in range(self.n) if indeg[v] == 0]
+        waves = []
+        seen = 0
+        while wave:
+            waves.append(wave)
+            seen += len(wave)
+            nextWave = []
+            for u in wave:
+                for w in self.adjList[u]:
+                    indeg[w] -= 1
+                    if indeg[w] == 0:
+                        nextWave.append(w)
+            wave = nextWave
+
+        return [] if seen != self.n else waves
+
     def kahnTopologicalSort(self):
         indeg = [0] * self.n
 
@@ -93,9 +484,71 @@ def testTopologicalSort():
     # this graph is not DAG
     graph = Graph(3, [[0, 1], [1, 2], [2, 0]])
     assert graph.kahnTopologicalSort() == []
+    assert graph.topologicalWaves() == []
+
+    graph = Graph(5, [[0, 2], [1, 2], [2, 3], [0, 4]])
+    assert graph.topologicalWaves() == [[0, 1], [4, 2], [3]]
+
+    # same answer with the CSR adjacency
+    graph = Graph(3, [[0, 1], [1, 2], [0, 2]], storage="csr")
+    assert graph.kahnTopologicalSort() == [0, 1, 2]
+
+
+def testIncrementalTopologicalOrder():
+    edges = [[0, 1], [1, 2]]
+    graph = Graph(5, edges)
+    graph.addEdge(3, 0)
+    assert edges == [[0, 1], [1, 2]]  # the caller's list is left alone
+    graph.addEdge(2, 4)
+    order = graph.topologicalOrder()
+    for u, v in graph.edges:
+        assert graph.precedes(u, v)
+
+    # 4 -> 3 would close 3 -> 0 -> 1 -> 2 -> 4 -> 3
+    try:
+        graph.addEdge(4, 3)
+        assert False
+    except ValueError:
+        pass
+    assert [4, 3] not in graph.edges
+
+    graph.removeEdge(3, 0)
+    graph.addEdge(4, 3)
+    for u, v in graph.edges:
+        assert graph.precedes(u, v)
+    print(order)  # 0 1 2 4 3
+    assert sorted(graph.kahnTopologicalSort()) == sorted(order)
+
+    # a self-loop is the shortest cycle
+    try:
+        graph.addEdge(1, 1)
+        assert False
+    except ValueError:
+        pass
+    assert [1, 1] not in graph.edges
+
+    try:
+        Graph(2, [[0, 1]], storage="csr").removeEdge(0, 1)
+        assert False
+    except ValueError:
+        pass
+
+
+def testFloydWarshall():
+    graph = Graph(3, [[0, 1], [1, 2]])
+    inf = float("inf")
+    assert graph.floydWarshall() == [[0, 1, 2], [inf, 0, 1], [inf, inf, 0]]
+
+    # a self-loop does not cost a hop to stay in place
+    graph = Graph(3, [[0, 1], [1, 1], [1, 2]])
+    assert graph.floydWarshall() == [[0, 1, 2], [inf, 0, 1], [inf, inf, 0]]
+    assert graph.floydWarshall(engine="numpy").tolist() == \
+        graph.floydWarshall()
 
 
 def testKosaraju():
+    from fileUtil import savedCopy
+
     graph = Graph(4, [[0, 1], [1, 2], [2, 3]])
     print(graph.kojaraju())  # 0, 1, 2, 3
 
@@ -117,7 +570,59 @@ def testKosaraju():
                        [8, 6], [8, 9],
                        [9, 4]])
     print(graph.kojaraju())  # [0, 7], [1, 2, 3, 5, 6], [4, 9], [8]
+    assert Graph(10, graph.edges, storage="csr").kojaraju() == graph.kojaraju()
+
+    with savedCopy(graph, Graph.load) as mapped:
+        assert mapped.kojaraju() == graph.kojaraju()
+        assert sorted(mapped.edges) == sorted(graph.edges)
+        del mapped
+    assert sorted(graph.tarjan()) == sorted(graph.kojaraju())
+
+    # a long path and a long cycle used to exceed the recursion limit
+    n = 10000
+    graph = Graph(n, [[i, i + 1] for i in range(n - 1)])
+    assert graph.kojaraju() == [[i] for i in range(n)]
+    assert len(graph.tarjan()) == n
+    graph = Graph(n, [[i, (i + 1) % n] for i in range(n)])
+    assert graph.kojaraju() == [list(range(n))]
+    assert graph.tarjan() == [list(range(n))]
+
+
+def testCondensation():
+    # SCCs {0, 1, 2}, {3}, {4, 5}
+    graph = Graph(6, [[0, 1], [1, 2], [2, 0], [2, 3], [3, 4], [4, 5],
+                      [5, 4], [1, 3]])
+    comp, dag = graph.condensation()
+    assert comp[0] == comp[1] == comp[2] and comp[4] == comp[5]
+    assert len(dag) == 3
+    assert list(dag[comp[0]]) == [comp[3]] and dag.degree(comp[4]) == 0
+    assert graph.reaches(1, 5) and not graph.reaches(5, 0)
+    assert graph.reaches(2, 0)
+    index = graph.reachabilityIndex()
+    assert graph.reaches(1, 5) and not graph.reaches(5, 0)
+    assert index.reaches(2, 0)
+
+    # a second edge between the same SCCs leaves the DAG alone,
+    # removing one of the two keeps the DAG edge
+    graph.addEdge(0, 3)
+    graph.removeEdge(1, 3)
+    assert graph.condensation()[1] is dag
+
+    # 5 -> 0 merges everything into one SCC
+    graph.addEdge(5, 0)
+    comp, dag = graph.condensation()
+    assert len(dag) == 1 and graph.reaches(5, 3)
+
+    # and removing it splits them again
+    graph.removeEdge(5, 0)
+    assert len(graph.condensation()[1]) == 3
+    assert not graph.reaches(4, 0)
+    assert sorted(graph.tarjan()) == sorted(graph.kojaraju())
 
 
-testTopologicalSort()
-testKosaraju()
+if __name__ == "__main__":
+    testTopologicalSort()
+    testIncrementalTopologicalOrder()
+    testFloydWarshall()
+    testKosaraju()
+    testCondensation()
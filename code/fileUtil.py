@@ -0,0 +1,19 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def savedCopy(obj, load, name="snapshot.bin"):
+    """
+    Round trip through a file, for the save/load tests:
+    obj.save into a temporary directory, then load it back
+    :param load: e.g. Graph.load, called with the file's path
+    :return: context manager yielding load(path); the directory and
+             the file are removed on exit, so close any mapping first
+             where the platform needs it
+    """
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, name)
+        obj.save(path)
+        yield load(path)
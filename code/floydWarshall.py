@@ -0,0 +1,176 @@
+try:
+    import numpy as np
+except ImportError:  # only the "numpy" and "blocked" engines need it
+    np = None
+
+
+def _requireNumpy():
+    if np is None:
+        raise ImportError("numpy is required for this Floyd-Warshall engine")
+
+
+def floydWarshallPython(mat, withPrev=False):
+    """
+    Textbook triple loop on a list-of-lists matrix
+    :param mat: n x n matrix, inf where there is no edge and 0 on the diagonal
+    :param withPrev: also build the predecessor matrix
+    :return: dist, or (dist, prev) where prev[i][j] is the vertex
+             right before j on a shortest i -> j path (-1 if none)
+    """
+    n = len(mat)
+    dist = [row[:] for row in mat]
+
+    if not withPrev:
+        for k in range(n):
+            for i in range(n):
+                for j in range(n):
+                    dist[i][j] = min(dist[i][j], dist[i][k] + dist[k][j])
+        return dist
+
+    prev = [[i if i != j and mat[i][j] != float("inf") else -1
+             for j in range(n)] for i in range(n)]
+    for k in range(n):
+        distK, prevK = dist[k], prev[k]
+        for i in range(n):
+            distI, prevI = dist[i], prev[i]
+            distIK = distI[k]
+            for j in range(n):
+                if distIK + distK[j] < distI[j]:
+                    distI[j] = distIK + distK[j]
+                    prevI[j] = prevK[j]
+    return dist, prev
+
+
+def distanceMatrix(n, edges, directed=True, weighted=True):
+    """
+    Builds the initial Floyd-Warshall matrix straight from the edge list
+    as a float64 array, without going through the list-of-lists adjMatrix.
+    Parallel edges keep the cheapest weight.
+    """
+    _requireNumpy()
+    dist = np.full((n, n), np.inf)
+    if edges:
+        e = np.asarray(edges)
+        us, vs = e[:, 0].astype(np.intp), e[:, 1].astype(np.intp)
+        ws = e[:, 2].astype(np.float64) if weighted else np.ones(len(e))
+        np.minimum.at(dist, (us, vs), ws)
+        if not directed:
+            np.minimum.at(dist, (vs, us), ws)
+    np.fill_diagonal(dist, 0)
+    return dist
+
+
+def _initialPrev(dist):
+    n = dist.shape[0]
+    prev = np.where(np.isfinite(dist), np.arange(n)[:, None], -1)
+    np.fill_diagonal(prev, -1)
+    return prev
+
+
+def floydWarshallNumpy(dist, withPrev=False):
+    """
+    Each k-iteration relaxes the whole matrix with one broadcasted minimum:
+    dist = min(dist, dist[:, k] + dist[k, :])
+    :param dist: n x n float array, modified in place
+    """
+    _requireNumpy()
+    prev = _initialPrev(dist) if withPrev else None
+    cand = np.empty_like(dist)
+
+    for k in range(dist.shape[0]):
+        np.add(dist[:, k, None], dist[None, k, :], out=cand)
+        if withPrev:
+            better = cand < dist
+            prev = np.where(better, prev[k, None, :], prev)
+        np.minimum(dist, cand, out=dist)
+
+    return (dist, prev) if withPrev else dist
+
+
+def floydWarshallBlocked(dist, withPrev=False, blockSize=64):
+    """
+    Cache-blocked Floyd-Warshall.
+    The k loop is cut into blocks kBlock. For every kBlock, its own rows
+    are relaxed first, which finishes rows k in kBlock for this round.
+    Every other band of blockSize rows is then relaxed through all of
+    kBlock while it is still in cache, instead of streaming the whole
+    matrix once per k.
+    Reading the already finished rows k only relaxes further, so the
+    distances are the same as the textbook order.
+    :param dist: n x n float array, modified in place
+    """
+    _requireNumpy()
+    n = dist.shape[0]
+    prev = _initialPrev(dist) if withPrev else None
+    blocks = [slice(s, min(s + blockSize, n)) for s in range(0, n, blockSize)]
+    buf = np.empty((blockSize, n))
+
+    for kBlock in blocks:
+        for band in [kBlock] + [b for b in blocks if b != kBlock]:
+            rows = dist[band]
+            cand = buf[:rows.shape[0]]
+            for k in range(kBlock.start, kBlock.stop):
+                np.add(rows[:, k, None], dist[None, k, :], out=cand)
+                if withPrev:
+                    better = cand < rows
+                    prev[band] = np.where(better, prev[k, None, :],
+                                          prev[band])
+                np.minimum(rows, cand, out=rows)
+
+    return (dist, prev) if withPrev else dist
+
+
+def reconstructPath(prev, u, v):
+    """
+    Rebuilds the shortest u -> v path from a Floyd-Warshall prev matrix
+    :return: list of vertices from u to v, or [] if v is unreachable
+    """
+    if u == v:
+        return [u]
+    if prev[u][v] == -1:
+        return []
+    path = [v]
+    while v != u:
+        v = int(prev[u][v])
+        path.append(v)
+    return path[::-1]
+
+
+def testFloydWarshallEngines():
+    inf = float("inf")
+    edges = [[0, 1, 1], [1, 3, 1], [0, 2, 2], [2, 3, 2], [1, 2, 1]]
+    mat = [[0, 1, 2, inf],
+           [1, 0, 1, 1],
+           [2, 1, 0, 2],
+           [inf, 1, 2, 0]]
+    expected = [[0, 1, 2, 2],
+                [1, 0, 1, 1],
+                [2, 1, 0, 2],
+                [2, 1, 2, 0]]
+
+    dist, prev = floydWarshallPython(mat, withPrev=True)
+    assert dist == expected
+    assert reconstructPath(prev, 0, 3) == [0, 1, 3]
+    assert reconstructPath(prev, 3, 3) == [3]
+
+    if np is None:
+        print("numpy not installed, skipping the vectorized engines")
+        return
+
+    dist = distanceMatrix(4, edges, directed=False)
+    assert floydWarshallNumpy(dist.copy()).tolist() == expected
+    for blockSize in (1, 3, 64):
+        d, p = floydWarshallBlocked(dist.copy(), True, blockSize)
+        assert d.tolist() == expected
+        assert reconstructPath(p, 0, 3) == [0, 1, 3]
+
+    # directed and unreachable pairs
+    dist = distanceMatrix(3, [[0, 1], [1, 2]], weighted=False)
+    d, p = floydWarshallNumpy(dist, withPrev=True)
+    assert d.tolist() == [[0, 1, 2], [inf, 0, 1], [inf, inf, 0]]
+    assert reconstructPath(p, 0, 2) == [0, 1, 2]
+    assert reconstructPath(p, 2, 0) == []
+
+
+if __name__ == "__main__":
+    testFloydWarshallEngines()
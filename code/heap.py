@@ -1,3 +1,6 @@
+from array import array
+
+
 # heapify first n elements of the array
 def max_heapify(arr, n, i):
     l = 2 * i + 1
@@ -40,6 +43,93 @@ def heap_sort(arr):
     return arr
 
 
+class IndexedMinHeap:
+    # Min-heap over the ids 0..n-1, each id stored at most once.
+    # pos[v] remembers where v sits in the heap, so its priority can be
+    # lowered in place (decrease_key) instead of pushing a duplicate.
+    # d is the number of children per node (2 for a binary heap).
+    def __init__(self, n, d=2):
+        self.d = d
+        self.heap = array("q")
+        self.pos = array("q", [-1]) * n
+        self.key = [None] * n
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, v):
+        return self.pos[v] != -1
+
+    def push(self, v, key):
+        self.key[v] = key
+        self.pos[v] = len(self.heap)
+        self.heap.append(v)
+        self.sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        """
+        Removes the id with the smallest priority
+        :return: (priority, id)
+        """
+        top = self.heap[0]
+        last = self.heap.pop()
+        self.pos[top] = -1
+        if self.heap:
+            # move the last element to the root and sink it down,
+            # like sortdown in heap_sort
+            self.heap[0] = last
+            self.pos[last] = 0
+            self.sift_down(0)
+        return self.key[top], top
+
+    def decrease_key(self, v, key):
+        self.key[v] = key
+        self.sift_up(self.pos[v])
+
+    def push_or_decrease(self, v, key):
+        if self.pos[v] == -1:
+            self.push(v, key)
+        else:
+            self.decrease_key(v, key)
+
+    def sift_up(self, i):
+        heap, pos, key, d = self.heap, self.pos, self.key, self.d
+        v = heap[i]
+        while i > 0:
+            parent = (i - 1) // d
+            p = heap[parent]
+            if key[p] <= key[v]:
+                break
+            # move the parent down instead of swapping at every level
+            heap[i] = p
+            pos[p] = i
+            i = parent
+        heap[i] = v
+        pos[v] = i
+
+    def sift_down(self, i):
+        # min-heap counterpart of max_heapify, generalized to d children
+        # and written as a loop instead of recursion
+        heap, pos, key, d = self.heap, self.pos, self.key, self.d
+        n = len(heap)
+        v = heap[i]
+        while True:
+            first = d * i + 1
+            if first >= n:
+                break
+            smallest = first
+            for c in range(first + 1, min(first + d, n)):
+                if key[heap[c]] < key[heap[smallest]]:
+                    smallest = c
+            if key[heap[smallest]] >= key[v]:
+                break
+            heap[i] = heap[smallest]
+            pos[heap[i]] = i
+            i = smallest
+        heap[i] = v
+        pos[v] = i
+
+
 if __name__ == "__main__":
     # Test 1
     arr = [1, 2, 3, 4, 5]
@@ -59,3 +149,15 @@ if __name__ == "__main__":
     # heap sort testing
     arr = [3, 4, 7, 11, 14.0, 14, 12, 20, 17, 200, 16, 20]
     print(heap_sort(arr))
+
+    # indexed min-heap with decrease_key
+    for d in (2, 4):
+        h = IndexedMinHeap(6, d)
+        for v, key in enumerate([5, 3, 8, 1, 9, 7]):
+            h.push(v, key)
+        h.decrease_key(4, 0)
+        h.decrease_key(2, 2)
+        assert 4 in h and len(h) == 6
+        order = [h.pop() for _ in range(len(h))]
+        assert order == [(0, 4), (1, 3), (2, 2), (3, 1), (5, 0), (7, 5)]
+        assert 4 not in h
@@ -0,0 +1,120 @@
+import os
+import weakref
+from array import array
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+from csrGraph import CSR
+import weightedUndirectedGraph
+
+# Per worker process state, set once by _attach
+_shm = None
+_graph = None
+
+
+def _attach(spec):
+    global _shm, _graph
+    _shm, csr = CSR.fromSharedMemory(spec)
+    _graph = weightedUndirectedGraph.Graph.fromCSR(csr)
+
+
+def _attachFile(path):
+    global _graph
+    _graph = weightedUndirectedGraph.Graph.load(path)
+
+
+def _solve(s):
+    dist, prev = _graph.dijkstra(s)
+    # arrays pickle as raw bytes, much cheaper than lists of numbers
+    return s, array("d", dist), array("q", prev)
+
+
+def dijkstraMany(g, sources, workers=None):
+    """
+    Runs Dijkstra from every source on a process pool.
+    The CSR arrays are copied once into shared memory and every worker
+    attaches to them, so only the source ids are sent per task.
+    :param g: weightedUndirectedGraph.Graph (list or csr storage, or
+              mapped by Graph.load, whose file the workers map instead)
+    :param sources: iterable of source vertices
+    :param workers: pool size, defaults to the number of CPUs
+    :return: generator of (s, dist, prev) in completion order,
+             with dist as array("d") and prev as array("q")
+    """
+    if g.storage == "csr":
+        csr = g.adjList
+    else:
+        csr = CSR.fromEdges(g.n, g.edges, directed=False, weighted=True)
+
+    if csr.path is not None:
+        # mapped by Graph.load: every worker maps the same file and the
+        # OS shares its pages, so there is nothing to copy
+        yield from _run(sources, workers, _attachFile, csr.path)
+        return
+
+    shm, spec = csr.toSharedMemory()
+    try:
+        yield from _run(sources, workers, _attach, spec)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _run(sources, workers, initializer, spec):
+    # a few tasks per worker in flight: enough to keep the pool busy,
+    # and every result is let go of as soon as it is yielded, so memory
+    # stays O(workers * n) however many sources there are
+    inFlight = 4 * (workers or os.cpu_count() or 1)
+    sources = iter(sources)
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                               initargs=(spec,))
+    try:
+        pending = {pool.submit(_solve, s)
+                   for s in islice(sources, inFlight)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for s in islice(sources, len(done)):
+                pending.add(pool.submit(_solve, s))
+            while done:
+                yield done.pop().result()
+    finally:
+        # on close() or break, queued sources are dropped instead of run
+        pool.shutdown(cancel_futures=True)
+
+
+def testDijkstraMany():
+    from fileUtil import savedCopy
+
+    g = weightedUndirectedGraph.Graph(4, [
+        [0, 1, 1],
+        [1, 3, 1],
+        [0, 2, 2],
+        [2, 3, 2],
+        [1, 2, 1]
+    ])
+    results = {s: (list(dist), list(prev))
+               for s, dist, prev in dijkstraMany(g, range(g.n), workers=2)}
+    for s in range(g.n):
+        assert results[s] == g.dijkstra(s)
+    print(results[0])  # ([0.0, 1.0, 2.0, 2.0], [-1, 0, 0, 1])
+
+    # yielded arrays are not kept alive by the generator
+    chain = weightedUndirectedGraph.Graph(
+        100, [[i, i + 1, 1] for i in range(99)])
+    stream = dijkstraMany(chain, range(100), workers=2)
+    refs = []
+    for s, dist, prev in islice(stream, 60):
+        refs.append(weakref.ref(dist))
+    del dist, prev
+    assert sum(ref() is not None for ref in refs) == 0
+    stream.close()  # cancels the sources not yet started
+
+    # the workers map the same file, which lives until the block ends
+    with savedCopy(g, weightedUndirectedGraph.Graph.load) as mapped:
+        for s, dist, prev in dijkstraMany(mapped, range(g.n), workers=2):
+            assert (list(dist), list(prev)) == results[s]
+        del mapped
+
+
+if __name__ == "__main__":
+    testDijkstraMany()
@@ -0,0 +1,54 @@
+def pathTo(prev, t):
+    """
+    Follows prev back from t to the source, which has prev -1
+    :param prev: list, dict or array of predecessors
+    :return: list of vertices from the source to t
+    """
+    path = []
+    while t != -1:
+        path.append(int(t))
+        t = prev[t]
+    return path[::-1]
+
+
+class PathView:
+    # Every path of a traversal tree, backed by one predecessor array
+    # (O(n) memory) instead of a copied list per vertex (O(n * depth)).
+    # view[t] rebuilds the source -> t path in O(length) when asked,
+    # [] if t was not reached, and iterating yields them one at a time.
+    def __init__(self, parent, source):
+        self.parent = parent
+        self.source = source
+
+    def __len__(self):
+        return len(self.parent)
+
+    def __getitem__(self, t):
+        if t != self.source and self.parent[t] == -1:
+            return []
+        return pathTo(self.parent, t)
+
+    def __iter__(self):
+        for t in range(len(self.parent)):
+            yield self[t]
+
+    def __eq__(self, other):
+        return isinstance(other, PathView) and \
+            self.source == other.source and \
+            list(self.parent) == list(other.parent)
+
+    def __repr__(self):
+        return f"PathView({list(self)})"
+
+
+def testPathTo():
+    assert pathTo([-1, 0, 1, 1], 3) == [0, 1, 3]
+    assert pathTo({5: -1, 7: 5}, 7) == [5, 7]
+
+    view = PathView([1, -1, 1, -1], 1)
+    assert view[2] == [1, 2] and view[1] == [1] and view[3] == []
+    assert list(view) == [[1, 0], [1], [1, 2], []]
+
+
+if __name__ == "__main__":
+    testPathTo()
@@ -0,0 +1,116 @@
+import time
+from array import array
+from bisect import bisect_right
+
+
+class ReachabilityIndex:
+    # "Can u reach v" oracle over the SCC condensation of a directed graph
+    # (interval labels on a spanning forest, Agrawal et al.).
+    # A DFS over the condensed DAG numbers every SCC in postorder, so the
+    # DFS subtree of a is the interval [low[a], post[a]]. The label of a is
+    # the union of its own interval and its successors' labels, kept as
+    # sorted disjoint intervals: a reaches b iff post[b] falls in one,
+    # which is a binary search, O(log n) per query.
+    # Labels stay short when the reachable sets are mostly contiguous in
+    # postorder; the worst case is O(c^2) like a full closure.
+    def __init__(self, comp, dag):
+        """
+        :param comp: SCC id per vertex, from Graph.condensation
+        :param dag: condensed DAG as a CSR, from Graph.condensation
+        """
+        start = time.perf_counter()
+        self.comp = comp
+        c = len(dag)
+        low = array("q", bytes(8 * c))
+        post = array("q", bytes(8 * c))
+        visited = bytearray(c)
+        finished = []
+        counter = 0
+
+        for root in range(c):
+            if visited[root]:
+                continue
+            visited[root] = 1
+            low[root] = counter
+            st = [(root, iter(dag[root]))]
+            while st:
+                a, successors = st[-1]
+                for b in successors:
+                    if not visited[b]:
+                        visited[b] = 1
+                        low[b] = counter
+                        st.append((b, iter(dag[b])))
+                        break
+                else:
+                    st.pop()
+                    post[a] = counter
+                    counter += 1
+                    finished.append(a)
+
+        # In a DAG every successor finishes first, so the labels of
+        # successors are ready when a is reached in finish order
+        labels = [None] * c
+        for a in finished:
+            intervals = [[low[a], post[a]]]
+            for b in dag[a]:
+                intervals.extend(labels[b])
+            intervals.sort()
+            merged = [list(intervals[0])]
+            for s, e in intervals[1:]:
+                last = merged[-1]
+                if s <= last[1] + 1:
+                    if e > last[1]:
+                        last[1] = e
+                else:
+                    merged.append([s, e])
+            labels[a] = merged
+
+        # flattened like a CSR: the intervals of a are
+        # starts[offsets[a]:offsets[a + 1]], ends[...]
+        self.post = post
+        self.offsets = array("q", [0])
+        self.starts = array("q")
+        self.ends = array("q")
+        for label in labels:
+            for s, e in label:
+                self.starts.append(s)
+                self.ends.append(e)
+            self.offsets.append(len(self.starts))
+
+        self.buildTime = time.perf_counter() - start
+
+    def reaches(self, u, v):
+        a, b = self.comp[u], self.comp[v]
+        p = self.post[b]
+        lo, hi = self.offsets[a], self.offsets[a + 1]
+        i = bisect_right(self.starts, p, lo, hi)
+        return i > lo and self.ends[i - 1] >= p
+
+    def nbytes(self):
+        return sum(arr.itemsize * len(arr) for arr in
+                   (self.post, self.offsets, self.starts, self.ends))
+
+
+def testReachabilityIndex():
+    from directedGraph import Graph
+
+    # SCCs {0, 1, 2}, {3}, {4, 5}, and 6 only reaches 4 and 5
+    graph = Graph(7, [[0, 1], [1, 2], [2, 0], [2, 3], [3, 4], [4, 5],
+                      [5, 4], [6, 5]])
+    index = ReachabilityIndex(*graph.condensation())
+    for u in range(graph.n):
+        visited = [False] * graph.n
+        graph.dfs(u, visited, [])
+        for v in range(graph.n):
+            assert index.reaches(u, v) == visited[v]
+    print(index.buildTime, index.nbytes())
+
+    # a diamond makes the label of 0 the union of two branches
+    graph = Graph(5, [[0, 1], [0, 2], [1, 3], [2, 3], [4, 2]])
+    index = ReachabilityIndex(*graph.condensation())
+    assert index.reaches(0, 3) and index.reaches(4, 3)
+    assert not index.reaches(4, 1) and not index.reaches(3, 0)
+
+
+if __name__ == "__main__":
+    testReachabilityIndex()
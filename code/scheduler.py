@@ -0,0 +1,211 @@
+import asyncio
+import time
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                FIRST_COMPLETED, wait)
+
+from directedGraph import Graph
+from paths import pathTo
+
+
+class ScheduleReport:
+    # What runTopological measured:
+    # results[v]      return value of task(v)
+    # nodeTime[v]     wall time of task(v) alone, in seconds
+    # waves           graph.topologicalWaves(), the ideal parallel steps
+    # criticalPath    the chain of dependencies with the largest total
+    #                 nodeTime; no schedule can finish faster than
+    #                 criticalPathTime
+    # wallTime        start to finish of the whole run
+    def __init__(self, graph, results, nodeTime, finishOrder, wallTime,
+                 waves=None):
+        self.results = results
+        self.nodeTime = nodeTime
+        self.waves = graph.topologicalWaves() if waves is None else waves
+        self.wallTime = wallTime
+
+        # longest path weighted by node time, over the finish order
+        # (a topological order, since a task starts after its inputs)
+        predecessors = [[] for _ in range(graph.n)]
+        for u, v in graph.edges:
+            predecessors[v].append(u)
+        finish = [0.0] * graph.n
+        prev = [-1] * graph.n
+        for v in finishOrder:
+            for u in predecessors[v]:
+                if prev[v] == -1 or finish[u] > finish[prev[v]]:
+                    prev[v] = u
+            finish[v] = nodeTime[v]
+            if prev[v] != -1:
+                finish[v] += finish[prev[v]]
+
+        self.criticalPath = []
+        self.criticalPathTime = 0.0
+        if graph.n:
+            end = max(range(graph.n), key=finish.__getitem__)
+            self.criticalPath = pathTo(prev, end)
+            self.criticalPathTime = finish[end]
+
+    def parallelism(self):
+        # average number of tasks running at once
+        return sum(self.nodeTime) / self.wallTime if self.wallTime else 0.0
+
+    def __repr__(self):
+        return (f"ScheduleReport(wallTime={self.wallTime:.3f}s, "
+                f"criticalPathTime={self.criticalPathTime:.3f}s, "
+                f"parallelism={self.parallelism():.2f}, "
+                f"waves={len(self.waves)})")
+
+
+def _timedCall(task, v):
+    # runs inside the worker, so the time excludes queueing
+    start = time.perf_counter()
+    result = task(v)
+    return result, time.perf_counter() - start
+
+
+def _checkAcyclic(graph):
+    # before anything runs: a cycle found after the run would leave
+    # everything upstream of it already executed
+    waves = graph.topologicalWaves()
+    if graph.n and not waves:
+        raise ValueError("graph has a cycle")
+    return waves
+
+
+def _indegrees(graph):
+    indeg = [0] * graph.n
+    for u, v in graph.edges:
+        indeg[v] += 1
+    return indeg
+
+
+def runTopological(graph, task, executor="thread", workers=None):
+    """
+    Runs task(v) for every vertex of a directed Graph, each vertex only
+    after all its predecessors finished. A vertex is dispatched as soon
+    as its last dependency completes, not when its whole wave is done.
+    :param task: callable of one vertex; must be a module-level function
+                 for executor="process"
+    :param executor: "thread" or "process" (see runTopologicalAsync
+                     for asyncio)
+    :return: ScheduleReport
+    :raises ValueError: if the graph has a cycle, before any task runs
+    """
+    pool = ProcessPoolExecutor if executor == "process" else \
+        ThreadPoolExecutor
+    waves = _checkAcyclic(graph)
+    indeg = _indegrees(graph)
+    results = [None] * graph.n
+    nodeTime = [0.0] * graph.n
+    finishOrder = []
+
+    start = time.perf_counter()
+    with pool(max_workers=workers) as ex:
+        running = {ex.submit(_timedCall, task, v): v
+                   for v in range(graph.n) if indeg[v] == 0}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                v = running.pop(future)
+                results[v], nodeTime[v] = future.result()
+                finishOrder.append(v)
+                for w in graph.adjList[v]:
+                    indeg[w] -= 1
+                    if indeg[w] == 0:
+                        running[ex.submit(_timedCall, task, w)] = w
+    wallTime = time.perf_counter() - start
+
+    return ScheduleReport(graph, results, nodeTime, finishOrder, wallTime,
+                          waves)
+
+
+async def runTopologicalAsync(graph, task):
+    """
+    asyncio version of runTopological: task is a coroutine function,
+    and each vertex becomes an asyncio task once its inputs are done
+    """
+    async def timed(v):
+        begin = time.perf_counter()
+        result = await task(v)
+        return v, result, time.perf_counter() - begin
+
+    waves = _checkAcyclic(graph)
+    indeg = _indegrees(graph)
+    results = [None] * graph.n
+    nodeTime = [0.0] * graph.n
+    finishOrder = []
+
+    start = time.perf_counter()
+    running = {asyncio.create_task(timed(v))
+               for v in range(graph.n) if indeg[v] == 0}
+    while running:
+        done, running = await asyncio.wait(running,
+                                           return_when=FIRST_COMPLETED)
+        for finished in done:
+            v, results[v], nodeTime[v] = finished.result()
+            finishOrder.append(v)
+            for w in graph.adjList[v]:
+                indeg[w] -= 1
+                if indeg[w] == 0:
+                    running.add(asyncio.create_task(timed(w)))
+    wallTime = time.perf_counter() - start
+
+    return ScheduleReport(graph, results, nodeTime, finishOrder, wallTime,
+                          waves)
+
+
+def _sleepTask(v):
+    # 1 is far slower than anything else, so sleep jitter cannot change
+    # which chain is the critical one
+    time.sleep(0.2 if v == 1 else 0.01)
+    return v * v
+
+
+def testScheduler():
+    # 0 and 1 in parallel, 2 needs both, 3 needs 2, 4 only needs 0
+    graph = Graph(5, [[0, 2], [1, 2], [2, 3], [0, 4]])
+
+    # the critical path from given node times, no clock involved
+    report = ScheduleReport(graph, [None] * 5, [1.0, 2.0, 1.0, 1.0, 5.0],
+                            [0, 1, 4, 2, 3], 6.0)
+    assert report.criticalPath == [0, 4]
+    assert report.criticalPathTime == 6.0
+    report = ScheduleReport(graph, [None] * 5, [1.0, 2.0, 1.0, 1.0, 1.0],
+                            [0, 4, 1, 2, 3], 4.0)
+    assert report.criticalPath == [1, 2, 3]
+    assert report.criticalPathTime == 4.0
+
+    for executor in ("thread", "process"):
+        report = runTopological(graph, _sleepTask, executor, workers=4)
+        assert report.results == [0, 1, 4, 9, 16]
+        # 1 -> 2 -> 3 takes 0.2 + 0.01 + 0.01 seconds
+        assert report.criticalPath == [1, 2, 3]
+        print(executor, report)
+
+    async def asyncTask(v):
+        await asyncio.sleep(0.2 if v == 1 else 0.01)
+        return -v
+
+    report = asyncio.run(runTopologicalAsync(graph, asyncTask))
+    assert report.results == [0, -1, -2, -3, -4]
+    assert report.criticalPath == [1, 2, 3]
+    assert report.waves == [[0, 1], [4, 2], [3]]
+
+    # 3 -> 0 -> 1 <-> 2: the cycle is found before any task runs
+    ran = []
+    graph = Graph(4, [[0, 1], [1, 2], [2, 1], [3, 0]])
+    try:
+        runTopological(graph, ran.append)
+        assert False
+    except ValueError:
+        pass
+    try:
+        asyncio.run(runTopologicalAsync(graph, asyncTask))
+        assert False
+    except ValueError:
+        pass
+    assert ran == []
+
+
+if __name__ == "__main__":
+    testScheduler()
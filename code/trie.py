@@ -1,11 +1,28 @@
+import mmap
+import struct
+from array import array
+from bisect import bisect_left, insort
+from heapq import heappush, heappop, heapreplace
+from itertools import islice
+
+
 class TrieNode:
+    # no per-instance __dict__, which is most of a small object's size
+    __slots__ = ("children", "end", "freq", "count", "best", "top")
+
     def __init__(self):
         self.children = {}
         self.end = False
         self.freq = 0
+        self.count = 0  # times the word ending here was inserted
+        self.best = 0  # largest count in the subtree
+        self.top = None  # cached (-count, word) list, see complete
 
 
 class Trie:
+    # size of the completion list cached at every node
+    TOPK = 10
+
     def __init__(self):
         self.root = TrieNode()
 
@@ -15,12 +32,83 @@ class Trie:
         :param word: string to be inserted
         """
         node = self.root
+        path = [node]
         for c in word:
             if c not in node.children:
                 node.children[c] = TrieNode()
             node = node.children[c]
             node.freq += 1
+            path.append(node)
         node.end = True
+        node.count += 1
+
+        # only this word's count changed, so a cached top list either
+        # moves it or lets it in in place of the last entry
+        count = node.count
+        for node in path:
+            if count > node.best:
+                node.best = count
+            if node.top is not None:
+                _updateTop(node.top, word, count, self.TOPK)
+
+    @classmethod
+    def from_words(cls, words):
+        """
+        Builds a Trie from an iterable of words, see bulk_insert
+        """
+        trie = cls()
+        trie.bulk_insert(words)
+        return trie
+
+    def bulk_insert(self, words):
+        """
+        An insert loop without the completion cache upkeep: every word
+        is walked from the root like in insert, but the cached
+        completion lists on the way are dropped instead of updated, so
+        no path is kept and best only needs a second walk for
+        duplicates. Past the first missing character the rest of a word
+        is created with freq and best already at 1 and no lookups.
+        The order of the words does not matter.
+        Every word is complete before the next one is read, so an
+        iterable that raises leaves a consistent Trie.
+        """
+        root = self.root
+        root.top = None
+        for word in words:
+            node = root
+            children = root.children
+            rest = iter(word)
+            for c in rest:
+                child = children.get(c)
+                if child is None:
+                    # nothing below exists, no lookups from here on
+                    node = children[c] = TrieNode()
+                    node.freq = 1
+                    node.best = 1
+                    for c in rest:
+                        child = node.children[c] = TrieNode()
+                        child.freq = 1
+                        child.best = 1
+                        node = child
+                    break
+                child.freq += 1
+                child.top = None
+                node = child
+                children = child.children
+            node.end = True
+            node.count += 1
+
+            # every node below the root already has a word of count
+            # >= 1 in its subtree, so best only moves for duplicates
+            count = node.count
+            if count > 1 or not root.best:
+                node = root
+                for c in word:
+                    if count > node.best:
+                        node.best = count
+                    node = node.children[c]
+                if count > node.best:
+                    node.best = count
 
     def visualize(self):
         def dfs(node, prefix="", indent=""):
@@ -58,6 +146,107 @@ class Trie:
             node = node.children[c]
         return node.freq
 
+    def _walkSorted(self, queries):
+        # Walks every distinct query once, in sorted order, keeping the
+        # nodes of the previous query's path: a query resumes from the
+        # prefix it shares with the previous one, so every shared prefix
+        # is walked once. path[i] is the node reached by the first i
+        # characters of prev.
+        # Yields (query, node), node None if the query leaves the Trie.
+        path = [self.root]
+        prev = ""
+        for q in sorted(set(queries)):
+            k = 0
+            for a, b in zip(prev, q):
+                if a != b:
+                    break
+                k += 1
+            k = min(k, len(path) - 1)
+            del path[k + 1:]
+            node = path[k]
+            for c in q[k:]:
+                node = node.children.get(c)
+                if node is None:
+                    break
+                path.append(node)
+            yield q, node
+            prev = q
+
+    def search_many(self, words):
+        """
+        searchAsWholeWord for many words at once, see _walkSorted
+        :param words: list of strings
+        :return: list of Booleans, in the order of words
+        """
+        found = {q: node is not None and node.end
+                 for q, node in self._walkSorted(words)}
+        return list(map(found.__getitem__, words))
+
+    def prefix_freq_many(self, prefixes):
+        """
+        searchFreqAsPrefix for many prefixes at once, see _walkSorted
+        :param prefixes: list of strings
+        :return: list of Integers, in the order of prefixes
+        """
+        freqs = {q: 0 if node is None else node.freq
+                 for q, node in self._walkSorted(prefixes)}
+        return list(map(freqs.__getitem__, prefixes))
+
+    def complete(self, prefix, k=10):
+        """
+        The k most frequent words starting with prefix
+        Up to TOPK completions are cached at the prefix's node on first
+        use and kept up to date by insert, so repeated prefixes cost a
+        walk and a slice
+        :return: list of (count, word), most frequent first, ties by word
+        """
+        node = self.root
+        for c in prefix:
+            if c not in node.children:
+                return []
+            node = node.children[c]
+        if k > self.TOPK:
+            return list(islice(self._completions(node, prefix), k))
+        if node.top is None:
+            node.top = [(-count, w) for count, w in
+                        islice(self._completions(node, prefix), self.TOPK)]
+        return [(-negCount, w) for negCount, w in node.top[:k]]
+
+    def iterComplete(self, prefix):
+        """
+        Every word starting with prefix, most frequent first, lazily,
+        for paging past the cached top list
+        :return: generator of (count, word)
+        """
+        node = self.root
+        for c in prefix:
+            if c not in node.children:
+                return
+            node = node.children[c]
+        yield from self._completions(node, prefix)
+
+    def _completions(self, node, prefix):
+        # Best-first search: a subtree is queued under its best count,
+        # an upper bound that some word inside reaches, so words come
+        # off the heap in (-count, word) order. At equal priority, a
+        # word sorts before the subtree under the same prefix.
+        heap = [(-node.best, prefix, 1, node)]
+        while heap:
+            negCount, word, isSubtree, at = heappop(heap)
+            if not isSubtree:
+                yield -negCount, word
+                continue
+            if at.end:
+                heappush(heap, (-at.count, word, 0, None))
+            for c, child in at.children.items():
+                heappush(heap, (-child.best, word + c, 1, child))
+
+    def freeze(self):
+        """
+        Read-only flat array copy of the Trie, see FrozenTrie
+        """
+        return FrozenTrie.fromTrie(self)
+
     def getLongestCommonPrefix(self):
         longestPfx, longestPfxLen = "", 0
         node = self.root
@@ -70,17 +259,332 @@ class Trie:
             node = node.children[c]
         return longestPfx, longestPfxLen
 
-    def getWordWithLowestEditDistance(self, word):
+    def getWordWithLowestEditDistance(self, word, maxDistance=2):
         """
         Searches the Trie for the word with the lowest edit distance
         Each substitution, insertion, deletion costs 1
+        :return: the closest word within maxDistance, None if there is none
         """
         # Checks if the word already exists in the Trie
         if self.searchAsWholeWord(word):
             return word
 
         # If not, tries to find the closest word
-        # TODO:
+        closest = self.fuzzySearch(word, maxDistance, k=1)
+        return closest[0][1] if closest else None
+
+    def fuzzySearch(self, word, maxDistance=2, k=10):
+        """
+        The k closest words by Levenshtein distance, at most maxDistance.
+        Walks the Trie carrying one row of the edit distance table per
+        node: row[j] is the distance between the node's prefix and
+        word[:j], so a child's row follows from its parent's in
+        O(maxDistance). Each prefix shared by many words is computed once,
+        and a branch is cut as soon as the smallest entry of its row
+        exceeds the bound, since extending the prefix never lowers it.
+        Once k words are found the bound drops to the kth distance.
+        :return: list of (distance, word), closest first, ties by word
+        """
+        if k <= 0:
+            return []
+        best = []  # max-heap of the k best as (-distance, reversed order)
+        bound = maxDistance
+        st = [(self.root, "", list(range(len(word) + 1)))]
+        while st:
+            node, prefix, row = st.pop()
+            if node.end and row[-1] <= bound:
+                entry = (-row[-1], _Desc(prefix))
+                if len(best) < k:
+                    heappush(best, entry)
+                elif entry > best[0]:
+                    heapreplace(best, entry)
+                if len(best) == k:
+                    bound = -best[0][0]
+
+            # Only the cells within bound of the diagonal can stay within
+            # bound; the others are capped at bound + 1, which is enough
+            # to know they are out
+            i = len(prefix) + 1
+            lo, hi = max(1, i - bound), min(len(word), i + bound)
+            for c, child in node.children.items():
+                nextRow = [bound + 1] * len(row)
+                nextRow[0] = left = i if lo == 1 else bound + 1
+                for j, wc, diag, up in zip(range(lo, hi + 1),
+                                           word[lo - 1:hi],
+                                           row[lo - 1:hi], row[lo:hi + 1]):
+                    left = min(up + 1,  # c is deleted
+                               left + 1,  # wc is inserted
+                               diag + (wc != c))  # match or substitution
+                    nextRow[j] = left
+                if min(nextRow) <= bound:
+                    st.append((child, prefix + c, nextRow))
+
+        return sorted((-d, desc.word) for d, desc in best)
+
+
+def _updateTop(top, word, count, k):
+    # top holds the best k (-count, word) of a subtree, sorted, and the
+    # count of word just grew to count
+    for i, (_, w) in enumerate(top):
+        if w == word:
+            del top[i]
+            break
+    else:
+        if len(top) == k and (-count, word) > top[-1]:
+            return
+    insort(top, (-count, word))
+    del top[k:]
+
+
+class _Desc:
+    # orders words in reverse, so the max-heap of fuzzySearch evicts
+    # the alphabetically last of equally distant words first
+    __slots__ = ("word",)
+
+    def __init__(self, word):
+        self.word = word
+
+    def __lt__(self, other):
+        return self.word > other.word
+
+    def __eq__(self, other):
+        return self.word == other.word
+
+
+class RadixNode:
+    # label is the whole string on the edge into this node
+    __slots__ = ("label", "children", "end", "freq")
+
+    def __init__(self, label):
+        self.label = label
+        self.children = {}  # first character of the child's label -> child
+        self.end = False
+        self.freq = 0
+
+
+class RadixTrie:
+    # Compressed (radix / Patricia) Trie with the same API as Trie.
+    # Every chain of single-child, non-end nodes of Trie is one node
+    # here, with the chain's characters as its label. Every character of
+    # such a chain has the same freq (all the words through the first
+    # one continue to the last), so one freq per node is enough.
+    # minimize() then shares identical subtrees, e.g. common suffixes,
+    # turning the tree into a frozen DAWG that only answers queries.
+    def __init__(self):
+        self.root = RadixNode("")
+        self.frozen = False
+
+    def insert(self, word):
+        if self.frozen:
+            raise ValueError("a minimized RadixTrie cannot be modified")
+        node = self.root
+        i = 0
+        while i < len(word):
+            child = node.children.get(word[i])
+            if child is None:
+                child = RadixNode(word[i:])
+                node.children[word[i]] = child
+                child.freq = 1
+                child.end = True
+                return
+
+            label = child.label
+            j = 1  # label[0] == word[i]
+            while j < len(label) and i + j < len(word) and \
+                    label[j] == word[i + j]:
+                j += 1
+            if j < len(label):
+                # the word leaves the edge midway: split it at j
+                mid = RadixNode(label[:j])
+                mid.freq = child.freq
+                mid.children[label[j]] = child
+                child.label = label[j:]
+                node.children[word[i]] = mid
+                child = mid
+            child.freq += 1
+            node = child
+            i += j
+        node.end = True
+
+    def _find(self, s):
+        # node whose path spells s, or whose edge s ends inside of,
+        # along with whether s ended exactly on that node
+        node = self.root
+        i = 0
+        while i < len(s):
+            child = node.children.get(s[i])
+            if child is None:
+                return None, False
+            label = child.label
+            if not s.startswith(label, i):
+                if label.startswith(s[i:]):
+                    return child, False
+                return None, False
+            i += len(label)
+            node = child
+        return node, True
+
+    def searchAsWholeWord(self, word):
+        node, exact = self._find(word)
+        return exact and node.end
+
+    def searchFreqAsPrefix(self, pfx):
+        node, _ = self._find(pfx)
+        return 0 if node is None else node.freq
+
+    def search_many(self, words):
+        found = {w: self.searchAsWholeWord(w) for w in set(words)}
+        return list(map(found.__getitem__, words))
+
+    def prefix_freq_many(self, prefixes):
+        freqs = {p: self.searchFreqAsPrefix(p) for p in set(prefixes)}
+        return list(map(freqs.__getitem__, prefixes))
+
+    def getLongestCommonPrefix(self):
+        longestPfx = ""
+        node = self.root
+        while not node.end and len(node.children) == 1:
+            node = next(iter(node.children.values()))
+            longestPfx += node.label
+        return longestPfx, len(longestPfx)
+
+    def visualize(self):
+        def dfs(node, indent=""):
+            for _, child in sorted(node.children.items()):
+                marker = "*" if child.end else ""
+                print(f"{indent}{child.label}{marker}")
+                dfs(child, indent + " ")
+
+        dfs(self.root)
+
+    def minimize(self):
+        """
+        Shares identical subtrees (same label, end, freq and children),
+        bottom up, so the node count drops to the number of distinct
+        subtrees. The result is a DAG and insert is disabled.
+        :return: number of nodes left
+        """
+        canonical = {}
+        st = [(self.root, False)]
+        while st:
+            node, childrenDone = st.pop()
+            if not childrenDone:
+                st.append((node, True))
+                st.extend((child, False) for child in node.children.values()
+                          if id(child) not in canonical)
+                continue
+            for c, child in node.children.items():
+                node.children[c] = canonical[id(child)]
+            key = (node.label, node.end, node.freq,
+                   tuple((c, id(child))
+                         for c, child in sorted(node.children.items())))
+            canonical[id(node)] = canonical.setdefault(key, node)
+        self.frozen = True
+        return len(set(map(id, canonical.values())))
+
+
+class FrozenTrie:
+    # Read-only Trie in flat arrays, nodes numbered in BFS order with
+    # the children of every node sorted by character:
+    # the children of node i are nodes offsets[i]..offsets[i + 1] - 1,
+    # labels[j] is the code point on the edge into node j, and end[j],
+    # freq[j] are those of the Trie node. Node 0 is the root.
+    # A child is found by binary search over its parent's labels.
+    # On disk (save/load): a 32 byte header, magic and node count,
+    # then offsets, freq, labels and end back to back.
+    MAGIC = b"TRI1"
+    HEADER = struct.Struct("<4s4xq16x")
+
+    def __init__(self, n, offsets, labels, end, freq):
+        self.n = n
+        self.offsets = offsets
+        self.labels = labels
+        self.end = end
+        self.freq = freq
+        # set by load: the mapped file, which must outlive the arrays
+        self.path = None
+        self._map = None
+
+    @classmethod
+    def fromTrie(cls, trie):
+        offsets = array("q", [1])
+        labels = array("I", [0])
+        end = bytearray()
+        freq = array("q")
+        order = [trie.root]
+        for node in order:  # order grows while it is read, BFS
+            end.append(node.end)
+            freq.append(node.freq)
+            for c, child in sorted(node.children.items()):
+                order.append(child)
+                labels.append(ord(c))
+            offsets.append(len(order))
+        return cls(len(order), offsets, labels, end, freq)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.n))
+            for arr in (self.offsets, self.freq, self.labels, self.end):
+                f.write(memoryview(arr).cast("B"))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Maps a file written by save, read only; lookups read the mapped
+        pages directly. Processes that map the same file, e.g. forked
+        workers, share its pages through the OS page cache.
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n = cls.HEADER.unpack_from(mapped)
+        if magic != cls.MAGIC:
+            mapped.close()
+            raise ValueError(f"{path} is not a Trie snapshot")
+        mv = memoryview(mapped)
+        at = cls.HEADER.size
+        offsets = mv[at:at + 8 * (n + 1)].cast("q")
+        at += 8 * (n + 1)
+        freq = mv[at:at + 8 * n].cast("q")
+        at += 8 * n
+        labels = mv[at:at + 4 * n].cast("I")
+        at += 4 * n
+        end = mv[at:at + n]
+        trie = cls(n, offsets, labels, end, freq)
+        trie.path = path
+        trie._map = mapped
+        return trie
+
+    def _node(self, s):
+        # index of the node spelled by s, -1 if s leaves the Trie
+        offsets, labels = self.offsets, self.labels
+        i = 0
+        for c in s:
+            code = ord(c)
+            lo, hi = offsets[i], offsets[i + 1]
+            i = bisect_left(labels, code, lo, hi)
+            if i == hi or labels[i] != code:
+                return -1
+        return i
+
+    def searchAsWholeWord(self, word):
+        i = self._node(word)
+        return i != -1 and bool(self.end[i])
+
+    def searchFreqAsPrefix(self, pfx):
+        i = self._node(pfx)
+        return 0 if i == -1 else self.freq[i]
+
+    def search_many(self, words):
+        found = {w: self.searchAsWholeWord(w) for w in set(words)}
+        return list(map(found.__getitem__, words))
+
+    def prefix_freq_many(self, prefixes):
+        freqs = {p: self.searchFreqAsPrefix(p) for p in set(prefixes)}
+        return list(map(freqs.__getitem__, prefixes))
+
+    def nbytes(self):
+        return sum(len(memoryview(arr).cast("B")) for arr in
+                   (self.offsets, self.freq, self.labels, self.end))
 
 
 def spellCheck(word, words):
@@ -101,9 +605,8 @@ def spellCheck(word, words):
     # check if the word exists in the Trie
     # set would be more efficient, but for the sake of demonstration...
 
-    # if the word is not found, traverse the Trie to find
-
-    return trie.getLongestCommonPrefix()
+    # if the word is not found, traverse the Trie to find the closest one
+    return trie.getWordWithLowestEditDistance(word)
 
 
 def testTrie():
@@ -118,6 +621,12 @@ def testTrie():
     trie.insert("dove")
     trie.visualize()
 
+    queries = ["dove", "ca", "cart", "do", "", "cat", "cow", "carts"]
+    assert trie.search_many(queries) == [trie.searchAsWholeWord(q)
+                                         for q in queries]
+    assert trie.prefix_freq_many(queries) == [trie.searchFreqAsPrefix(q)
+                                              for q in queries]
+
 
 def testTrie2():
     trie = Trie()
@@ -137,13 +646,139 @@ def testTrie2():
     trie.visualize()
 
 
+def testBulkInsert():
+    words = ["ca", "car", "car", "care", "cart", "cat", "dog", "dove", ""]
+    trie = Trie()
+    for w in words:
+        trie.insert(w)
+    queries = ["", "c", "ca", "car", "care", "carts", "d", "do", "dove", "x"]
+    for bulk in (Trie.from_words(sorted(words)),
+                 Trie.from_words(iter(words))):
+        assert bulk.search_many(queries) == trie.search_many(queries)
+        assert bulk.prefix_freq_many(queries) == \
+            trie.prefix_freq_many(queries)
+        assert bulk.complete("") == trie.complete("")
+
+    # on top of existing words, with a cached completion list
+    trie.complete("ca")
+    bulk = Trie.from_words(sorted(words))
+    bulk.complete("ca")
+    for t in (trie, bulk):
+        t.bulk_insert(["cab", "cat", "cat"])
+    assert bulk.prefix_freq_many(queries) == trie.prefix_freq_many(queries)
+    assert bulk.complete("ca") == trie.complete("ca")
+
+    # the words read before a failing iterable are all fully inserted
+    def failing():
+        yield from ["abcd", "abe", "abf"]
+        raise IOError("truncated word list")
+
+    trie = Trie()
+    try:
+        trie.bulk_insert(failing())
+        assert False
+    except IOError:
+        pass
+    assert trie.prefix_freq_many(["ab", "abe", "abf"]) == [3, 1, 1]
+    assert trie.complete("ab") == [(1, "abcd"), (1, "abe"), (1, "abf")]
+
+
+def testComplete():
+    trie = Trie()
+    for w, times in [("car", 5), ("cart", 2), ("cat", 5), ("care", 1),
+                     ("dog", 3), ("ca", 1)]:
+        for _ in range(times):
+            trie.insert(w)
+    assert trie.complete("ca", 3) == [(5, "car"), (5, "cat"), (2, "cart")]
+    assert trie.complete("x") == []
+    assert list(trie.iterComplete("car")) == [(5, "car"), (2, "cart"),
+                                              (1, "care")]
+
+    # the cached lists follow later inserts
+    for _ in range(4):
+        trie.insert("care")
+    trie.insert("cab")
+    assert trie.complete("ca", 3) == [(5, "car"), (5, "care"), (5, "cat")]
+    assert trie.complete("")[-2:] == [(1, "ca"), (1, "cab")]
+    assert trie.complete("c", 20) == list(trie.iterComplete("c"))
+
+
+def testRadixTrie():
+    words = ["cat", "car", "cart", "carts", "dog", "dove", "do", "car"]
+    trie, radix = Trie(), RadixTrie()
+    for w in words:
+        trie.insert(w)
+        radix.insert(w)
+    radix.visualize()
+
+    queries = ["c", "ca", "car", "cart", "cars", "carts", "cartsy", "d",
+               "do", "dov", "dove", "doves", "x", ""]
+    assert radix.search_many(queries) == trie.search_many(queries)
+    assert radix.prefix_freq_many(queries) == trie.prefix_freq_many(queries)
+    assert radix.getLongestCommonPrefix() == ("", 0)
+
+    # the "ing" leaves under "walk" and "talk" are identical subtrees
+    radix = RadixTrie()
+    for w in ["walking", "talking", "walk", "talk"]:
+        radix.insert(w)
+    before = radix.search_many(["walking", "talk", "tal", "walkin"])
+    assert radix.minimize() == 4  # root, "walk", "talk" and one "ing"
+    assert radix.search_many(["walking", "talk", "tal", "walkin"]) == before
+    assert radix.searchFreqAsPrefix("talki") == 1
+    try:
+        radix.insert("balk")
+        assert False
+    except ValueError:
+        pass
+
+
+def testFrozenTrie():
+    from fileUtil import savedCopy
+
+    trie = Trie()
+    for w in ["cat", "car", "cart", "dog", "dove", "do", "car", "über"]:
+        trie.insert(w)
+    queries = ["c", "ca", "car", "cart", "carts", "d", "do", "dove", "x",
+               "", "üb", "über"]
+    frozen = trie.freeze()
+    assert frozen.search_many(queries) == trie.search_many(queries)
+    assert frozen.prefix_freq_many(queries) == trie.prefix_freq_many(queries)
+
+    with savedCopy(frozen, FrozenTrie.load) as mapped:
+        assert mapped.n == frozen.n and mapped.nbytes() == frozen.nbytes()
+        assert mapped.search_many(queries) == trie.search_many(queries)
+        assert mapped.prefix_freq_many(queries) == \
+            trie.prefix_freq_many(queries)
+        del mapped
+
+
 def testSpellChecker():
     print(spellCheck("Hello", ["hello", "hi", "no"]))
+    assert spellCheck("Helo", ["hello", "hi", "no"]) == "hello"
+    assert spellCheck("xyzzy", ["hello", "hi", "no"]) is None
+
+    trie = Trie()
+    for w in ["cat", "car", "cart", "cast", "cut", "dog"]:
+        trie.insert(w)
+    assert trie.fuzzySearch("cat", 1, k=3) == [(0, "cat"), (1, "car"),
+                                               (1, "cart")]
+    assert trie.fuzzySearch("cat", 1, k=0) == []
+    assert trie.fuzzySearch("cst", 1) == [(1, "cast"), (1, "cat"),
+                                          (1, "cut")]
+    assert trie.getWordWithLowestEditDistance("dgo") == "dog"
 
 
 if __name__ == "__main__":
     testTrie()
     print("Test #2")
     testTrie2()
+    print("Bulk insert test")
+    testBulkInsert()
+    print("Completion test")
+    testComplete()
+    print("Radix trie test")
+    testRadixTrie()
+    print("Frozen trie test")
+    testFrozenTrie()
     print("Spell checker test")
     testSpellChecker()
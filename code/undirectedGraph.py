@@ -1,57 +1,202 @@
+from array import array
 from collections import deque
+from csrGraph import CSR, readEdges
+from paths import PathView
+
+try:
+    import numpy as np
+except ImportError:  # only bfsFrontier needs it
+    np = None
 
 
 class Graph:
     # e.g.,: Graph(n = 3, edges = [[0,1],[1,2],[0,2]])
     # creates a graph with 3 nodes indexed 0, 1, 2,
     # with each connected to each other
-    def __init__(self, n: int, edges: list[list[int]]):
+    # storage="csr" keeps the adjacency in flat arrays (see csrGraph.py)
+    def __init__(self, n: int, edges: list[list[int]], storage="list"):
         self.n = n
+        self._edges = edges
+        self.storage = storage
+
+        if storage == "csr":
+            self.adjList = CSR.fromEdges(n, edges, directed=False)
+        else:
+            self.adjList = [[] for _ in range(n)]
+            for u, v in edges:
+                self.adjList[u].append(v)
+                self.adjList[v].append(u)
+
+        self._adjMatrix = None
+
+    @classmethod
+    def fromCSR(cls, csr):
+        # Wraps an adjacency that is already in CSR form (e.g. mapped
+        # by load); the edge list is only rebuilt if something asks for it
+        g = cls.__new__(cls)
+        g.n = csr.n
+        g._edges = None
+        g.storage = "csr"
+        g.adjList = csr
+        g._adjMatrix = None
+        return g
+
+    @classmethod
+    def fromEdgeStream(cls, edges, n=None, batchSize=65536):
+        # CSR storage built from an edge iterator read once in batches,
+        # without an edge list; see CSR.fromEdgeStream. adjList.edgesRead
+        # and adjList.buildTime give the ingestion throughput
+        csr = CSR.fromEdgeStream(edges, n, directed=False,
+                                 batchSize=batchSize)
+        return cls.fromCSR(csr)
 
-        self.adjList = [[] for _ in range(n)]
-        for u, v in edges:
-            self.adjList[u].append(v)
-            self.adjList[v].append(u)
+    @classmethod
+    def fromEdgeFile(cls, path, n=None, sep=None, batchSize=65536):
+        # streams a text or CSV (sep=",") edge list, see readEdges
+        return cls.fromEdgeStream(readEdges(path, sep), n, batchSize)
 
-        self.adjMatrix = [[float("inf") for _ in range(n)] for _ in range(n)]
-        for i in range(v):
-            self.adjMatrix[i][i] = 0
-        for u, v in edges:
-            self.adjMatrix[u][v] = 1
-            self.adjMatrix[v][u] = 1
+    def save(self, path):
+        # binary CSR file with both directions of every edge, see CSR.save
+        csr = self.adjList if self.storage == "csr" else \
+            CSR.fromEdges(self.n, self.edges, directed=False)
+        csr.save(path, directed=False)
 
+    @classmethod
+    def load(cls, path):
+        # memory-maps a file written by save, in milliseconds at any size
+        csr, directed = CSR.load(path)
+        if directed or csr.weights is not None:
+            raise ValueError(f"{path} does not hold an unweighted "
+                             "undirected graph")
+        return cls.fromCSR(csr)
+
+    @property
+    def edges(self):
+        # rebuilt from adjList for graphs made by fromCSR, keeping every
+        # edge once, from its lower endpoint
+        if self._edges is None:
+            self._edges = [[u, v] for u in range(self.n)
+                           for v in self.adjList[u] if u < v]
+        return self._edges
+
+    @property
+    def adjMatrix(self):
+        # The O(n^2) matrix is only built on first access,
+        # so graphs that never use it are O(n + m) to construct
+        if self._adjMatrix is None:
+            mat = [[float("inf")] * self.n for _ in range(self.n)]
+            for i in range(self.n):
+                mat[i][i] = 0
+            for u, v in self.edges:
+                if u != v:  # a self-loop leaves the 0 diagonal alone
+                    mat[u][v] = 1
+                    mat[v][u] = 1
+            self._adjMatrix = mat
+        return self._adjMatrix
+
+    # bfs and dfs_iterative record only the parent of every vertex.
+    # The returned PathView rebuilds path[w] from it on request,
+    # instead of copying path[u] + [w] for every vertex
     def bfs(self, v: int):  # v is the starting node
         q = deque()
         dist = [-1] * self.n
-        path = [[] for _ in range(self.n)]
+        parent = array("q", [-1]) * self.n
         visited = [False] * self.n
 
         q.append(v)
         dist[v] = 0
-        path[v] = [0]
         visited[v] = True
 
         while q:
-            u = q.pop()
+            u = q.popleft()  # FIFO, popping from the right would be DFS
 
             for w in self.adjList[u]:
                 if not visited[w]:
                     q.append(w)
                     dist[w] = dist[u] + 1
-                    path[w] = path[u] + [w]
+                    parent[w] = u
                     visited[w] = True
 
-        return dist, path, visited
+        return dist, PathView(parent, v), visited
+
+    def bfsFrontier(self, v: int, directionOptimizing=True,
+                    alpha=14, beta=24):
+        """
+        Level-synchronous BFS over the CSR arrays: a whole level is
+        expanded with a handful of numpy operations instead of one
+        deque operation per vertex. Paths are not copied; use
+        paths.PathView(parent, v) to rebuild them on request.
+        With directionOptimizing, a level is expanded bottom-up
+        (every unvisited vertex looks for a parent in the frontier)
+        when the frontier's edges outnumber the unvisited vertices'
+        edges / alpha, and top-down again once the frontier is smaller
+        than n / beta (Beamer et al.), which pays off on low-diameter
+        graphs where the middle levels hold most of the vertices.
+        :return: dist (-1 if unreachable) and parent (-1 at the root
+                 and unreachable vertices), both numpy arrays
+        """
+        if np is None:
+            raise ImportError("numpy is required for bfsFrontier")
+        csr = self.adjList if self.storage == "csr" else \
+            CSR.fromEdges(self.n, self.edges, directed=False)
+        offsets = np.frombuffer(csr.offsets, dtype=np.int64)
+        targets = np.frombuffer(csr.targets, dtype=np.int64)
+        degree = np.diff(offsets)
+
+        dist = np.full(self.n, -1, dtype=np.int64)
+        parent = np.full(self.n, -1, dtype=np.int64)
+        visited = np.zeros(self.n, dtype=np.bool_)
+
+        frontier = np.array([v], dtype=np.int64)
+        dist[v] = 0
+        visited[v] = True
+        unvisitedEdges = len(targets) - degree[v]
+        bottomUp = False
+        level = 0
+
+        while len(frontier):
+            frontierEdges = degree[frontier].sum()
+            if directionOptimizing:
+                if not bottomUp and frontierEdges > unvisitedEdges / alpha:
+                    bottomUp = True
+                elif bottomUp and len(frontier) < self.n / beta:
+                    bottomUp = False
+
+            if bottomUp:
+                # candidates: every unvisited vertex, checked against
+                # a boolean mask of the frontier
+                inFrontier = np.zeros(self.n, dtype=np.bool_)
+                inFrontier[frontier] = True
+                children = np.flatnonzero(~visited)
+                owners, nbrs = _gather(offsets, targets, children)
+                hit = inFrontier[nbrs]
+                # the first frontier neighbor of each vertex is its parent
+                found, first = np.unique(owners[hit], return_index=True)
+                parent[found] = nbrs[hit][first]
+            else:
+                owners, nbrs = _gather(offsets, targets, frontier)
+                fresh = ~visited[nbrs]
+                # a vertex reached by several frontier vertices keeps
+                # the first one as its parent
+                found, first = np.unique(nbrs[fresh], return_index=True)
+                parent[found] = owners[fresh][first]
+
+            level += 1
+            dist[found] = level
+            visited[found] = True
+            unvisitedEdges -= degree[found].sum()
+            frontier = found
+
+        return dist, parent
 
     def dfs_iterative(self, v: int):  # v is the starting node
         st = []
         dist = [-1] * self.n
-        path = [[] for _ in range(self.n)]
+        parent = array("q", [-1]) * self.n
         visited = [False] * self.n
 
         st.append(v)
         dist[v] = 0
-        path[v] = [0]
         visited[v] = True
 
         while st:
@@ -61,22 +206,31 @@ class Graph:
                 if not visited[w]:
                     st.append(w)
                     dist[w] = dist[u] + 1
-                    path[w] = path[u] + [w]
+                    parent[w] = u
                     visited[w] = True
 
-        return dist, path, visited
+        return dist, PathView(parent, v), visited
 
-    # helper function for finding connected components using recursive DFS
+    # helper function for finding connected components using DFS.
+    # The recursion is replaced by an explicit stack of neighbor iterators,
+    # which visits the vertices in the same order without the depth limit
     def dfs_recursive_driver(self, v: int,
                              visited,
                              connectedComponents,
                              currConnectedCompIdx):
         visited[v] = True
         connectedComponents[currConnectedCompIdx].append(v)
-        for w in self.adjList[v]:
-            if not visited[w]:
-                self.dfs_recursive_driver(
-                    w, visited, connectedComponents, currConnectedCompIdx)
+        st = [iter(self.adjList[v])]
+
+        while st:
+            for w in st[-1]:
+                if not visited[w]:
+                    visited[w] = True
+                    connectedComponents[currConnectedCompIdx].append(w)
+                    st.append(iter(self.adjList[w]))
+                    break
+            else:
+                st.pop()
 
     def find_connected_comp(self):
         visited = [False] * self.n
@@ -93,15 +247,78 @@ class Graph:
         return connectedComponents
 
 
+def _gather(offsets, targets, vertices):
+    # all (vertex, neighbor) pairs of the given vertices, as two flat
+    # arrays, without a Python loop over the vertices
+    starts = offsets[vertices]
+    counts = offsets[vertices + 1] - starts
+    owners = np.repeat(vertices, counts)
+    # position of every pair inside its vertex's neighbor slice
+    within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts,
+                                                 counts)
+    return owners, targets[np.repeat(starts, counts) + within]
+
+
 def testBFS():
+    from fileUtil import savedCopy
+
     g = Graph(5, [[0, 1], [1, 2], [2, 3], [3, 4], [4, 0]])
     print(g.bfs(0))
+    dist, path, visited = g.bfs(2)
+    assert path[2] == [2] and path[0] == [2, 1, 0]
+
+    csrG = Graph(5, [[0, 1], [1, 2], [2, 3], [3, 4], [4, 0]], storage="csr")
+    assert csrG.bfs(0) == g.bfs(0)
+    assert csrG.dfs_iterative(0) == g.dfs_iterative(0)
+
+    with savedCopy(g, Graph.load) as mapped:
+        assert mapped.bfs(0) == g.bfs(0)
+        assert mapped.adjMatrix == g.adjMatrix
+        del mapped
+    streamed = Graph.fromEdgeStream(iter(g.edges), batchSize=2)
+    assert streamed.bfs(0) == g.bfs(0)
+    assert streamed.adjMatrix == g.adjMatrix
+
+    if np is not None:
+        for directionOptimizing in (False, True):
+            dist, parent = csrG.bfsFrontier(0, directionOptimizing)
+            assert dist.tolist() == [0, 1, 2, 2, 1]
+            assert PathView(parent, 0)[3] == [0, 4, 3]
+        g = Graph(6, [[0, 1], [1, 2], [3, 4]])
+        dist, parent = g.bfsFrontier(0)
+        assert dist.tolist() == [0, 1, 2, -1, -1, -1]
+        assert parent.tolist() == [-1, 0, 1, -1, -1, -1]
+
+
+def testLazyAdjMatrix():
+    # 50k vertices would need 2.5 billion matrix cells if built eagerly
+    n = 50000
+    g = Graph(n, [[i, i + 1] for i in range(n - 1)])
+    assert g.adjList[n - 1] == [n - 2]
+    assert g._adjMatrix is None
+    # the parent array keeps a long chain at O(n) memory
+    dist, path, visited = g.bfs(0)
+    assert dist[n - 1] == n - 1 and path[n - 1] == list(range(n))
+
+    g = Graph(3, [[0, 1]])
+    assert g.adjMatrix == [[0, 1, float("inf")],
+                           [1, 0, float("inf")],
+                           [float("inf"), float("inf"), 0]]
 
 
 def testConnectedComp():
     g = Graph(5, [[0, 1], [1, 2], [2, 3]])
     print(g.find_connected_comp())
 
+    g = Graph(6, [[0, 3], [3, 1], [0, 2], [4, 5]])
+    assert g.find_connected_comp() == [[0, 3, 1, 2], [4, 5]]
+
+    n = 10000
+    g = Graph(n, [[i, i + 1] for i in range(n - 1)])
+    assert g.find_connected_comp() == [list(range(n))]
+
 
-testBFS()
-testConnectedComp()
+if __name__ == "__main__":
+    testBFS()
+    testLazyAdjMatrix()
+    testConnectedComp()
@@ -1,14 +1,26 @@
+import struct
+from array import array
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # findMany falls back to a plain loop
+    np = None
+
+
 class UnionFind:
     def __init__(self, n):
-        # Initially, each node is parent to itself
-        self.parent = list(range(n))
-        self.rank = [0] * n
-        self.size = [1] * n
+        # Initially, each node is parent to itself.
+        # Flat int arrays instead of lists of Python ints:
+        # 4 bytes per entry (1 for rank, which stays below 64)
+        self.parent = array("i", range(n))
+        self.rank = array("B", bytes(n))
+        self.size = array("i", [1]) * n
 
     def findBasic(self, p):
-        if self.parent[p] == p:
-            return p
-        return self.findBasic(self.parent[p])
+        while self.parent[p] != p:
+            p = self.parent[p]
+        return p
 
     def unionBasic(self, p, q):
         rootP = self.findBasic(p)
@@ -16,10 +28,24 @@ class UnionFind:
         self.parent[rootP] = rootQ
 
     def findPathCompression(self, p):
-        if self.parent[p] != p:
-            # path compression
-            self.parent[p] = self.findPathCompression(self.parent[p])
-        return self.parent[p]
+        # Two passes instead of recursion, so deep trees cannot
+        # overflow the stack: find the root, then point every node
+        # on the way directly at it
+        parent = self.parent
+        root = p
+        while parent[root] != root:
+            root = parent[root]
+        while parent[p] != root:
+            parent[p], p = root, parent[p]
+        return root
+
+    def findPathHalving(self, p):
+        # One pass variant: every node on the path skips to its grandparent
+        parent = self.parent
+        while parent[p] != p:
+            parent[p] = parent[parent[p]]
+            p = parent[p]
+        return p
 
     def unionByRank(self, p, q):
         rootP = self.findPathCompression(p)
@@ -47,3 +73,203 @@ class UnionFind:
         else:
             self.parent[rootQ] = rootP
             self.size[rootP] += self.size[rootQ]
+
+    def unionMany(self, pairs, limit=None):
+        """
+        Union by size for every pair, in order, in a single call.
+        Only the first two entries of each pair are read,
+        so [u, v, weight] edges can be passed as they are.
+        :param pairs: iterable of (p, q)
+        :param limit: stop once this many pairs have joined components
+        :return: bytearray with 1 where the pair joined two components,
+                 one entry per pair read
+        """
+        # the body of findPathHalving and unionBySize inlined,
+        # with the arrays bound to locals
+        parent, size = self.parent, self.size
+        merged = bytearray()
+        remaining = -1 if limit is None else limit
+        for pair in pairs:
+            if remaining == 0:
+                break
+            p, q = pair[0], pair[1]
+            up = parent[p]
+            while up != p:
+                parent[p] = p = parent[up]
+                up = parent[p]
+            up = parent[q]
+            while up != q:
+                parent[q] = q = parent[up]
+                up = parent[q]
+            if p == q:
+                merged.append(0)
+                continue
+            if size[p] < size[q]:
+                p, q = q, p
+            parent[q] = p
+            size[p] += size[q]
+            merged.append(1)
+            remaining -= 1
+        return merged
+
+    def findMany(self, ids):
+        """
+        Roots of many ids at once.
+        With numpy, all ids climb one level per step together
+        (pointer jumping over a view of parent), then point at their root.
+        :return: numpy array of roots, or a list without numpy
+        """
+        if np is None:
+            return [self.findPathHalving(p) for p in ids]
+
+        parent = np.frombuffer(self.parent, dtype=np.int32)
+        ids = np.asarray(ids, dtype=np.intp)
+        roots = parent[ids]
+        while True:
+            grandparents = parent[roots]
+            if np.array_equal(grandparents, roots):
+                break
+            roots = grandparents
+        parent[ids] = roots
+        return roots
+
+
+class IncrementalConnectivity(UnionFind):
+    # Online connectivity over a growing set of nodes.
+    # Edges arrive one at a time (or from an iterator) and every query
+    # costs one find, O(alpha(n)) amortized.
+    # Nodes are added on demand: an edge touching id n grows the structure.
+    MAGIC = b"UFC1"
+
+    def __init__(self, n=0):
+        super().__init__(n)
+        self.components = n
+
+    def __len__(self):
+        return len(self.parent)
+
+    def addNode(self):
+        v = len(self.parent)
+        self.parent.append(v)
+        self.rank.append(0)
+        self.size.append(1)
+        self.components += 1
+        return v
+
+    def addEdge(self, u, v):
+        """
+        :return: True if the edge merged two components
+        """
+        while max(u, v) >= len(self.parent):
+            self.addNode()
+        if not self.unionMany(((u, v),))[0]:
+            return False
+        self.components -= 1
+        return True
+
+    # the inherited unions would skip components (and unionBasic and
+    # unionByRank the sizes), so all of them go through addEdge
+    def unionBasic(self, p, q):
+        return self.addEdge(p, q)
+
+    def unionByRank(self, p, q):
+        return self.addEdge(p, q)
+
+    def unionBySize(self, p, q):
+        return self.addEdge(p, q)
+
+    def feed(self, edges, batchSize=65536):
+        """
+        Consumes an edge iterator or generator of (u, v) pairs,
+        batchSize edges at a time through unionMany
+        :return: number of edges that merged two components
+        """
+        edges = iter(edges)
+        merges = 0
+        while True:
+            batch = list(islice(edges, batchSize))
+            if not batch:
+                return merges
+            highest = max(max(u, v) for u, v in batch)
+            while highest >= len(self.parent):
+                self.addNode()
+            merged = sum(self.unionMany(batch))
+            self.components -= merged
+            merges += merged
+
+    def connected(self, u, v):
+        return self.findPathHalving(u) == self.findPathHalving(v)
+
+    def componentSize(self, u):
+        return self.size[self.findPathHalving(u)]
+
+    def save(self, path):
+        # header (magic, n, components) followed by the raw arrays,
+        # so load is a few bulk reads
+        with open(path, "wb") as f:
+            f.write(self.MAGIC)
+            f.write(struct.pack("<qq", len(self.parent), self.components))
+            self.parent.tofile(f)
+            self.rank.tofile(f)
+            self.size.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        ic = cls()
+        with open(path, "rb") as f:
+            if f.read(4) != cls.MAGIC:
+                raise ValueError(f"{path} is not a connectivity snapshot")
+            n, ic.components = struct.unpack("<qq", f.read(16))
+            ic.parent.fromfile(f, n)
+            ic.rank.fromfile(f, n)
+            ic.size.fromfile(f, n)
+        return ic
+
+
+def testUnionFind():
+    uf = UnionFind(6)
+    uf.unionByRank(0, 1)
+    uf.unionBySize(2, 3)
+    assert uf.findPathCompression(1) == uf.findPathCompression(0)
+    assert uf.findPathHalving(3) == uf.findPathHalving(2)
+    assert uf.findBasic(4) == 4
+
+    assert list(uf.unionMany([[1, 2, 7], [0, 3, 9], [4, 5, 1]])) == [1, 0, 1]
+    assert list(UnionFind(4).unionMany([[0, 1], [2, 3], [1, 2]], 2)) == [1, 1]
+    assert len(set(uf.findMany([0, 1, 2, 3]))) == 1
+    assert list(uf.findMany([4, 5])) == [uf.findBasic(4)] * 2
+
+    # a chain of 100k nodes used to overflow the recursive find
+    n = 100000
+    uf = UnionFind(n)
+    for i in range(n - 1):
+        uf.unionBasic(i, i + 1)
+    assert uf.findPathCompression(0) == n - 1
+    assert uf.parent[0] == n - 1
+
+
+def testIncrementalConnectivity():
+    from fileUtil import savedCopy
+
+    ic = IncrementalConnectivity(3)
+    assert ic.components == 3
+    assert ic.feed(iter([(0, 1), (1, 0), (4, 5)])) == 2
+    # nodes 3, 4 and 5 were added by the edge (4, 5)
+    assert len(ic) == 6 and ic.components == 4
+    assert ic.connected(0, 1) and not ic.connected(1, 2)
+    assert ic.componentSize(5) == 2
+    v = ic.addNode()
+    assert ic.addEdge(v, 2) and ic.components == 4
+    for union in (ic.unionBasic, ic.unionByRank, ic.unionBySize):
+        union(3, 4)
+    assert ic.components == 3 and ic.componentSize(3) == 3
+
+    with savedCopy(ic, IncrementalConnectivity.load) as copy:
+        assert copy.components == ic.components
+        assert copy.parent == ic.parent and copy.size == ic.size
+        assert copy.connected(2, 6)
+
+
+if __name__ == "__main__":
+    testUnionFind()
+    testIncrementalConnectivity()
@@ -1,32 +1,135 @@
+import random
 from heapq import heappush, heappop
+from itertools import chain
+
+try:
+    import numpy as np
+except ImportError:  # only kruskalMSTArrays needs it
+    np = None
+
 from unionFind import UnionFind
+from heap import IndexedMinHeap
+from boruvka import boruvkaMST
+from paths import pathTo, PathView
+from csrGraph import CSR, readEdges
+from floydWarshall import (floydWarshallPython, floydWarshallNumpy,
+                           floydWarshallBlocked, distanceMatrix,
+                           reconstructPath)
 
 
 class Graph:
     # e.g.,: Graph(n = 3, edges = [[0,1,3],[1,2,1],[0,2,6]])
     # creates a graph with 3 nodes indexed 0, 1, 2,
     # with 0 - 1 (weight 3), 0 - 2 (weight 6), 1 - 2 (weight 1)
-    def __init__(self, n: int, edges: list[list[int]]):
+    # storage="csr" keeps the adjacency in flat arrays (see csrGraph.py)
+    def __init__(self, n: int, edges: list[list[int]], storage="list"):
         self.n = n
-        self.edges = edges
-
-        self.adjList = [[] for _ in range(n)]
-        for u, v, weight in edges:
-            self.adjList[u].append((v, weight))
-            self.adjList[v].append((u, weight))
-
-        self.adjMatrix = [[float("inf") for _ in range(n)] for _ in range(n)]
-        for i in range(v):
-            self.adjMatrix[i][i] = 0
-        for u, v, w in edges:
-            self.adjMatrix[u][v] = weight
-            self.adjMatrix[v][u] = weight
-
-    def dijkstra(self, s):
+        self._edges = edges
+        self.storage = storage
+
+        if storage == "csr":
+            self.adjList = CSR.fromEdges(n, edges, directed=False,
+                                         weighted=True)
+        else:
+            self.adjList = [[] for _ in range(n)]
+            for u, v, weight in edges:
+                self.adjList[u].append((v, weight))
+                self.adjList[v].append((u, weight))
+
+        self._adjMatrix = None
+
+    @classmethod
+    def fromCSR(cls, csr):
+        # Wraps an adjacency that is already in CSR form (e.g. attached
+        # from shared memory); the edge list is only rebuilt if something
+        # asks for it
+        g = cls.__new__(cls)
+        g.n = csr.n
+        g._edges = None
+        g.storage = "csr"
+        g.adjList = csr
+        g._adjMatrix = None
+        return g
+
+    @classmethod
+    def fromEdgeStream(cls, edges, n=None, batchSize=65536):
+        # CSR storage built from an edge iterator read once in batches,
+        # without an edge list; see CSR.fromEdgeStream. adjList.edgesRead
+        # and adjList.buildTime give the ingestion throughput
+        csr = CSR.fromEdgeStream(edges, n, directed=False,
+                                 weighted=True, batchSize=batchSize)
+        return cls.fromCSR(csr)
+
+    @classmethod
+    def fromEdgeFile(cls, path, n=None, sep=None, batchSize=65536):
+        # streams a text or CSV (sep=",") edge list, see readEdges
+        edges = readEdges(path, sep, weighted=True)
+        return cls.fromEdgeStream(edges, n, batchSize)
+
+    def save(self, path):
+        # binary CSR file with both directions of every edge, see CSR.save
+        csr = self.adjList if self.storage == "csr" else \
+            CSR.fromEdges(self.n, self.edges, directed=False, weighted=True)
+        csr.save(path, directed=False)
+
+    @classmethod
+    def load(cls, path):
+        # Memory-maps a file written by save, in milliseconds at any size.
+        # dijkstra and the other traversals read the mapped arrays,
+        # and kruskalMST sorts edge columns viewed straight from them
+        csr, directed = CSR.load(path)
+        if directed or csr.weights is None:
+            raise ValueError(f"{path} does not hold a weighted "
+                             "undirected graph")
+        return cls.fromCSR(csr)
+
+    @property
+    def edges(self):
+        # rebuilt from adjList for graphs made by fromCSR, keeping every
+        # edge once, from its lower endpoint, like _edgeColumns
+        if self._edges is None:
+            self._edges = [[u, v, w] for u in range(self.n)
+                           for v, w in self.adjList[u] if u < v]
+        return self._edges
+
+    @property
+    def adjMatrix(self):
+        # The O(n^2) matrix is only built on first access (floydWarshall),
+        # so graphs that never use it are O(n + m) to construct
+        if self._adjMatrix is None:
+            mat = [[float("inf")] * self.n for _ in range(self.n)]
+            for i in range(self.n):
+                mat[i][i] = 0
+            # like distanceMatrix: parallel edges keep the cheapest
+            # weight and self-loops leave the 0 diagonal alone
+            for u, v, w in self.edges:
+                if u != v and w < mat[u][v]:
+                    mat[u][v] = w
+                    mat[v][u] = w
+            self._adjMatrix = mat
+        return self._adjMatrix
+
+    def dijkstra(self, s, indexedHeap=False, arity=2):
         dist = [float("inf")] * self.n
         prev = [-1] * self.n
 
         dist[s] = 0
+
+        if indexedHeap:
+            # each vertex is in the heap at most once and its priority
+            # is lowered in place, so there are no stale entries to skip
+            q = IndexedMinHeap(self.n, arity)
+            q.push(s, 0)
+            while q:
+                priority, u = q.pop()
+                for w, weight in self.adjList[u]:
+                    candidate = priority + weight
+                    if candidate < dist[w]:
+                        dist[w] = candidate
+                        prev[w] = u
+                        q.push_or_decrease(w, candidate)
+            return dist, prev
+
         q = [(0, s)]
 
         while q:
@@ -42,26 +145,126 @@ class Graph:
 
         return dist, prev
 
-    def floydWarshall(self):
-        dist = [row[:] for row in self.adjMatrix]
-
-        for k in range(self.n):
-            for i in range(self.n):
-                for j in range(self.n):
-                    dist[i][j] = min(dist[i][j], dist[i][k] + dist[k][j])
-
-        return dist
+    # Point-to-point queries.
+    # Each returns (distance, path, settled) where path is the list of
+    # vertices from s to t ([] if unreachable) and settled counts the
+    # vertices taken off the heap. dist/prev are dicts holding only the
+    # vertices the search touched, so a query does not pay O(n) upfront.
+    def shortestPath(self, s, t):
+        # Dijkstra that stops as soon as t is settled
+        return self.aStar(s, t, lambda v, t: 0)
+
+    def aStar(self, s, t, heuristic):
+        # heuristic(v, t) must never overestimate the v -> t distance;
+        # with a zero heuristic this is plain Dijkstra with early exit
+        dist = {s: 0}
+        prev = {s: -1}
+        q = [(heuristic(s, t), 0, s)]
+        settled = 0
 
-    def primMST(self, s, visited):
+        while q:
+            _, priority, u = heappop(q)
+            if priority != dist[u]:
+                continue  # stale entry, see dijkstra
+            settled += 1
+            if u == t:
+                return priority, pathTo(prev, t), settled
+
+            for w, weight in self.adjList[u]:
+                candidate = priority + weight
+                if candidate < dist.get(w, float("inf")):
+                    dist[w] = candidate
+                    prev[w] = u
+                    heappush(q, (candidate + heuristic(w, t), candidate, w))
+
+        return float("inf"), [], settled
+
+    def bidirectionalDijkstra(self, s, t):
+        # Grows one search from s and one from t (the graph is undirected,
+        # so the backward search uses the same adjacency), always
+        # advancing the side with the smaller heap top. best is the
+        # shortest s - t path seen through an edge joining the two sides;
+        # once both heap tops add up to at least best, nothing shorter
+        # can be found.
+        if s == t:
+            return 0, [s], 0
+
+        dist = ({s: 0}, {t: 0})
+        prev = ({s: -1}, {t: -1})
+        q = ([(0, s)], [(0, t)])
+        best, meet = float("inf"), None
+        settled = 0
+
+        while q[0] and q[1] and q[0][0][0] + q[1][0][0] < best:
+            side = 0 if q[0][0][0] <= q[1][0][0] else 1
+            priority, u = heappop(q[side])
+            if priority != dist[side][u]:
+                continue
+            settled += 1
+
+            other = dist[1 - side]
+            for w, weight in self.adjList[u]:
+                candidate = priority + weight
+                if candidate < dist[side].get(w, float("inf")):
+                    dist[side][w] = candidate
+                    prev[side][w] = u
+                    heappush(q[side], (candidate, w))
+                if w in other and candidate + other[w] < best:
+                    # remember the edge u - w that closes the path
+                    best = candidate + other[w]
+                    meet = (side, u, w)
+
+        if meet is None:
+            return float("inf"), [], settled
+
+        # join the two halves at the closing edge, since w may have been
+        # reached more cheaply on its own side than through u
+        side, u, w = meet
+        path = pathTo(prev[side], u) + pathTo(prev[1 - side], w)[::-1]
+        return best, path if side == 0 else path[::-1], settled
+
+    def floydWarshall(self, engine="python", withPrev=False, blockSize=64):
+        # engine="numpy" does each k-iteration as one broadcasted minimum,
+        # engine="blocked" is the cache-tiled variant for large n.
+        # Both return numpy arrays; see floydWarshall.py.
+        # withPrev=True also returns the predecessor matrix for
+        # floydWarshall.reconstructPath
+        if engine != "python":
+            dist = distanceMatrix(self.n, self.edges, directed=False)
+            if engine == "blocked":
+                return floydWarshallBlocked(dist, withPrev, blockSize)
+            return floydWarshallNumpy(dist, withPrev)
+        return floydWarshallPython(self.adjMatrix, withPrev)
+
+    def primMST(self, s, visited, indexedHeap=False, arity=2):
         dist = [float("inf")] * self.n
         prev = [-1] * self.n
 
         dist[s] = 0
-        q = [(0, s)]
 
         cost = 0
         mstEdges = []
 
+        if indexedHeap:
+            # set_priority version: see dijkstra
+            q = IndexedMinHeap(self.n, arity)
+            q.push(s, 0)
+            while q:
+                priority, u = q.pop()
+                visited[u] = True
+                cost += priority
+                if prev[u] != -1:
+                    mstEdges.append((prev[u], u, priority))
+
+                for v, weight in self.adjList[u]:
+                    if not visited[v] and weight < dist[v]:
+                        prev[v] = u
+                        dist[v] = weight
+                        q.push_or_decrease(v, weight)
+            return cost, mstEdges
+
+        q = [(0, s)]
+
         while q:
             priority, u = heappop(q)
 
@@ -84,33 +287,88 @@ class Graph:
 
         return cost, mstEdges
 
-    def primAllVertices(self):
+    def primAllVertices(self, indexedHeap=False, arity=2):
         cost = 0
         mstEdges = []
         visited = [False] * self.n
         for v in range(self.n):
             if not visited[v]:
-                localCost, localMstEdges = self.primMST(v, visited)
+                localCost, localMstEdges = self.primMST(
+                    v, visited, indexedHeap, arity)
                 cost += localCost
                 mstEdges.extend(localMstEdges)
 
         return cost, mstEdges
 
     def kruskalMST(self):
+        if self._edges is None:
+            # no edge list to sort (fromCSR, load): take the array path
+            cost, (us, vs, weights) = self.kruskalMSTArrays()
+            return cost.item(), list(zip(us.tolist(), vs.tolist(),
+                                         weights.tolist()))
+
         # Sort edges based on their weights
         sortedEdges = sorted(self.edges, key=lambda edge: edge[2])
 
+        # An edge belongs to the MST iff it joins two components.
+        # unionMany answers that for every sorted edge in one call
         uf = UnionFind(self.n)
+        joined = uf.unionMany(sortedEdges)
         cost = 0
         mstEdges = []
-        for u, v, weight in sortedEdges:
-            if uf.findPathCompression(u) != uf.findPathCompression(v):
+        for (u, v, weight), isJoined in zip(sortedEdges, joined):
+            if isJoined:
                 mstEdges.append((u, v, weight))
                 cost += weight
-                uf.unionByRank(u, v)
 
         return cost, mstEdges
 
+    def boruvkaMST(self, workers=None):
+        # Parallel Boruvka, see boruvka.py. Same (cost, mstEdges) shape
+        # as primAllVertices and kruskalMST, so callers can switch engines
+        return boruvkaMST(self.n, self.edges, workers)
+
+    def kruskalMSTArrays(self):
+        # Fast path of kruskalMST on numpy columns:
+        # argsort the weight column instead of sorting Python lists,
+        # one find per endpoint (unionMany), and stop as soon as
+        # n - 1 edges are accepted since the forest is then complete.
+        # Ties keep their input order, so the MST edges are the same as
+        # kruskalMST, returned as arrays: cost, (us, vs, weights)
+        if np is None:
+            raise ImportError("numpy is required for kruskalMSTArrays")
+        us, vs, weights = self._edgeColumns()
+
+        order = np.argsort(weights, kind="stable")
+        pairs = zip(us[order].tolist(), vs[order].tolist())
+        joined = UnionFind(self.n).unionMany(pairs, limit=self.n - 1)
+
+        scanned = order[:len(joined)]
+        picked = scanned[np.frombuffer(joined, dtype=np.bool_)]
+        return weights[picked].sum(), (us[picked], vs[picked], weights[picked])
+
+    def _edgeColumns(self):
+        # us, vs, weights as numpy columns, from the edge list or, without
+        # one, viewed from the CSR buffers (each edge is stored twice
+        # there and kept once, from its lower endpoint)
+        if self._edges is not None:
+            isInt = all(isinstance(e[2], int) for e in self.edges)
+            edges = np.fromiter(chain.from_iterable(self.edges),
+                                dtype=np.int64 if isInt else np.float64,
+                                count=3 * len(self.edges)).reshape(-1, 3)
+            us = edges[:, 0].astype(np.intp)
+            vs = edges[:, 1].astype(np.intp)
+            return us, vs, edges[:, 2]
+
+        csr = self.adjList
+        offsets = np.frombuffer(csr.offsets, dtype=np.int64)
+        targets = np.frombuffer(csr.targets, dtype=np.int64)
+        weights = np.frombuffer(csr.weights, dtype=np.int64
+                                if csr.weightCode() == "q" else np.float64)
+        owners = np.repeat(np.arange(self.n), np.diff(offsets))
+        keep = owners < targets
+        return owners[keep], targets[keep].astype(np.intp), weights[keep]
+
 
 def testDijkstra():
     """
@@ -180,6 +438,29 @@ def testDijkstra():
     print("\nTest Case 4 - Multiple Paths")
     print("Distances:", dist4)  # Expected: [0, 1, 2, 2]
     print("Prev:", prev4)       # Expected: [-1, 0, 1, 1] or [-1, 0, 0, 1]
+    print("Paths:", list(PathView(prev4, 0)))
+
+    g5 = Graph(4, g4.edges, storage="csr")
+    assert g5.dijkstra(0) == (dist4, prev4)
+    assert g4.dijkstra(0, indexedHeap=True)[0] == dist4
+    assert g4.dijkstra(0, indexedHeap=True, arity=4)[0] == dist4
+
+
+def testShortestPath():
+    g = Graph(5, [
+        [0, 1, 1],
+        [1, 3, 1],
+        [0, 2, 2],
+        [2, 3, 2],
+        [1, 2, 1]
+    ])
+    print(g.shortestPath(0, 3))  # (2, [0, 1, 3], settled)
+    assert g.shortestPath(0, 3)[:2] == (2, [0, 1, 3])
+    assert g.bidirectionalDijkstra(0, 3)[:2] == (2, [0, 1, 3])
+    assert g.bidirectionalDijkstra(3, 0)[:2] == (2, [3, 1, 0])
+    assert g.aStar(0, 3, lambda v, t: 0)[:2] == (2, [0, 1, 3])
+    assert g.shortestPath(0, 4)[:2] == (float("inf"), [])
+    assert g.bidirectionalDijkstra(0, 4)[:2] == (float("inf"), [])
 
 
 def testFloydWarshall():
@@ -193,11 +474,34 @@ def testFloydWarshall():
     dist4 = g4.floydWarshall()
     print("\nTest Case 4 - Multiple Paths")
     # [0, 1, 2, 2]
-    # [inf, 0, 1, 1]
-    # [inf, inf, 0, 2]
-    # [inf, inf, inf, 0]
+    # [1, 0, 1, 1]
+    # [2, 1, 0, 2]
+    # [2, 1, 2, 0]
     print("Distances:", dist4)
 
+    dist, prev = g4.floydWarshall(withPrev=True)
+    assert dist == dist4
+    print("Path 0 -> 3:", reconstructPath(prev, 0, 3))  # [0, 1, 3]
+
+    # parallel edges and self-loops: every engine keeps the cheapest
+    # edge and a 0 diagonal
+    rng = random.Random(3)
+    for _ in range(20):
+        g = Graph(6, [[rng.randrange(6), rng.randrange(6), rng.randint(1, 9)]
+                      for _ in range(12)])
+        dist = g.floydWarshall()
+        if np is not None:
+            assert g.floydWarshall(engine="numpy").tolist() == dist
+            assert g.floydWarshall(engine="blocked",
+                                   blockSize=4).tolist() == dist
+        assert all(dist[i][i] == 0 for i in range(6))
+
+    # a streamed graph has no edge list until one is asked for
+    streamed = Graph.fromEdgeStream(iter(g4.edges), batchSize=2)
+    assert streamed.floydWarshall() == dist4
+    if np is not None:
+        assert streamed.floydWarshall(engine="numpy").tolist() == dist4
+
     """
       (0)
      /   \
@@ -232,6 +536,8 @@ def testPrim():
     print("Prim: ")
     visited = [False] * g.n
     print(g.primMST(0, visited))
+    visited = [False] * g.n
+    assert g.primMST(0, visited, indexedHeap=True)[0] == 21
 
     g = Graph(7, [
         [0, 1, 2],
@@ -241,9 +547,12 @@ def testPrim():
     ])
     print("Prim on a disconnected graph: ")
     print(g.primAllVertices())
+    assert g.primAllVertices(indexedHeap=True) == g.primAllVertices()
 
 
 def testKruskal():
+    from fileUtil import savedCopy
+
     g = Graph(7, [
         [0, 1, 7],
         [0, 2, 6],
@@ -269,9 +578,29 @@ def testKruskal():
     print("Kruskal on a disconnected graph: ")
     print(g.kruskalMST())
 
+    assert g.boruvkaMST(workers=2)[0] == g.kruskalMST()[0]
+
+    if np is not None:
+        cost, (us, vs, weights) = g.kruskalMSTArrays()
+        assert (cost, list(zip(us.tolist(), vs.tolist(), weights.tolist()))) \
+            == g.kruskalMST()
+
+        with savedCopy(g, Graph.load) as mapped:
+            assert mapped.kruskalMST()[0] == g.kruskalMST()[0]
+            assert mapped.dijkstra(0) == g.dijkstra(0)
+            # the edge list is rebuilt from the mapped arrays on demand
+            assert sorted(mapped.edges) == sorted(g.edges)
+            assert mapped.floydWarshall() == g.floydWarshall()
+            assert (mapped.floydWarshall(engine="numpy") ==
+                    g.floydWarshall(engine="numpy")).all()
+            assert mapped.boruvkaMST()[0] == g.kruskalMST()[0]
+            del mapped
+
 
-testDijkstra()
-testFloydWarshall()
+if __name__ == "__main__":
+    testDijkstra()
+    testShortestPath()
+    testFloydWarshall()
 
-testPrim()
-testKruskal()
+    testPrim()
+    testKruskal()